@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from django.contrib import admin
 from django.contrib.auth.hashers import make_password
-from .models import Department, Worker, Project, ProjectMember
+from django.utils import timezone
+from .models import Department, Worker, Project, ProjectMember, ReportJob, ReportMetric
+from .reporting.metrics import summarize_metrics
 
 
 
@@ -57,6 +61,39 @@ class ProjectMemberAdmin(admin.ModelAdmin):
     list_filter = ("contribution",)
 
 
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "department", "report_type", "file_format", "status", "created_at", "finished_at")
+    list_filter = ("status", "report_type", "file_format")
+    readonly_fields = ("dedup_key", "created_at", "started_at", "finished_at", "error")
+
+
+@admin.register(ReportMetric)
+class ReportMetricAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at", "department", "report_type", "file_format", "department_projects",
+        "row_count", "output_bytes", "build_ms", "render_ms", "serialize_ms", "total_ms", "peak_memory_bytes",
+    )
+    list_filter = ("report_type", "file_format", "status_code")
+    date_hierarchy = "created_at"
+    summary_days = 30
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        since = timezone.now() - timedelta(days=self.summary_days)
+        extra_context = {
+            **(extra_context or {}),
+            "summary_days": self.summary_days,
+            "metric_summary": summarize_metrics(ReportMetric.objects.filter(created_at__gte=since)),
+        }
+        return super().changelist_view(request, extra_context=extra_context)
+
+
 admin.site.site_header = "Income Management Admin"
 admin.site.site_title = "Income Management Admin Area"
 admin.site.index_title = "Welcome to the Income Management Admin Area"
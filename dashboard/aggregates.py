@@ -0,0 +1,148 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Department, ProjectMember
+from .singleflight import single_flight
+
+
+WORKER_STATUS_KEYS = ("finished", "ongoing", "on_hold", "canceled")
+
+
+def split_project_amount(amount, members):
+    """
+    Split a project amount between its members.
+
+    ``members`` is a sequence of ``(member_id, contribution)`` pairs and the
+    result maps each member id to its share, following the gold / silver /
+    copper rules used across the dashboard.
+    """
+    if not amount:
+        return {}
+
+    gold = [member_id for member_id, contribution in members if contribution == "gold"]
+    silver = [member_id for member_id, contribution in members if contribution == "silver"]
+    copper = [member_id for member_id, contribution in members if contribution == "copper"]
+    total_amount = Decimal(amount)
+    payments = {}
+
+    if gold and not silver and not copper:
+        share = total_amount / len(gold)
+        for member_id in gold:
+            payments[member_id] = share
+    elif gold and silver and not copper:
+        gold_total = total_amount * Decimal("0.60")
+        silver_total = total_amount * Decimal("0.40")
+        for member_id in gold:
+            payments[member_id] = gold_total / len(gold)
+        for member_id in silver:
+            payments[member_id] = silver_total / len(silver)
+    elif gold and copper and not silver:
+        gold_total = total_amount * Decimal("0.70")
+        copper_total = total_amount * Decimal("0.30")
+        for member_id in gold:
+            payments[member_id] = gold_total / len(gold)
+        for member_id in copper:
+            payments[member_id] = copper_total / len(copper)
+    else:
+        weight_map = {"gold": 3, "silver": 2, "copper": 1}
+        total_weight = sum(weight_map[contribution] for _member_id, contribution in members)
+        if not total_weight:
+            return {}
+        for member_id, contribution in members:
+            payments[member_id] = (Decimal(weight_map[contribution]) / Decimal(total_weight)) * total_amount
+
+    return payments
+
+
+# =========================
+# DEPARTMENT DATA VERSION
+# =========================
+
+def department_data_version(dept_id):
+    """
+    The department's data version. It lives in the database so every
+    process (web workers, report workers, the prerender command) and every
+    restart agrees on it; on-disk artifacts are keyed by it.
+    """
+    version = Department.objects.filter(pk=dept_id).values_list("data_version", flat=True).first()
+    return version or 1
+
+
+def bump_department_data_version(dept_id):
+    Department.objects.filter(pk=dept_id).update(data_version=F("data_version") + 1)
+
+
+# =========================
+# PER-WORKER AGGREGATES
+# =========================
+
+def compute_worker_aggregates(dept_id, start_date=None, end_date=None):
+    """
+    Income, project count and per-status project counts for every worker
+    with at least one assignment in the department, from a single query.
+    ``start_date``/``end_date`` restrict it to projects started in that window.
+    """
+    memberships = ProjectMember.objects.filter(project__department_id=dept_id)
+    if start_date is not None:
+        memberships = memberships.filter(project__start_date__gte=start_date)
+    if end_date is not None:
+        memberships = memberships.filter(project__start_date__lte=end_date)
+    membership_rows = (
+        memberships
+        .values_list("id", "project_id", "worker_id", "contribution", "project__amount", "project__status")
+        .order_by("project_id", "id")
+    )
+
+    aggregates = {}
+
+    def flush(project_members, amount, status):
+        payments = split_project_amount(amount, [(member_id, contribution) for member_id, _worker_id, contribution in project_members])
+        for member_id, worker_id, _contribution in project_members:
+            entry = aggregates.get(worker_id)
+            if entry is None:
+                entry = aggregates[worker_id] = empty_worker_aggregate()
+            entry["income"] += payments.get(member_id, Decimal("0.00"))
+            entry["project_count"] += 1
+            if status in WORKER_STATUS_KEYS:
+                entry[status] += 1
+
+    current_project_id = None
+    current_members = []
+    current_amount = None
+    current_status = None
+    for member_id, project_id, worker_id, contribution, amount, status in membership_rows.iterator(chunk_size=2000):
+        if project_id != current_project_id:
+            if current_members:
+                flush(current_members, current_amount, current_status)
+            current_project_id = project_id
+            current_members = []
+            current_amount = amount
+            current_status = status
+        current_members.append((member_id, worker_id, contribution))
+    if current_members:
+        flush(current_members, current_amount, current_status)
+
+    return aggregates
+
+
+def worker_aggregates(dept):
+    """Cached :func:`compute_worker_aggregates`, invalidated by the department data version."""
+    version = department_data_version(dept.id)
+    key = f"dashboard:dept:{dept.id}:v{version}:worker-aggregates"
+
+    def compute():
+        aggregates = compute_worker_aggregates(dept.id)
+        cache.set(key, aggregates, getattr(settings, "WORKER_AGGREGATES_TIMEOUT", 300))
+        return aggregates
+
+    # Concurrent misses (e.g. right after a data change) compute once.
+    return single_flight(key, lambda: cache.get(key), compute)
+
+
+def empty_worker_aggregate():
+    entry = {"income": Decimal("0.00"), "project_count": 0}
+    entry.update({status_key: 0 for status_key in WORKER_STATUS_KEYS})
+    return entry
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.core.cache import caches
+
+
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_HASH_MAX_PENDING = 32
+
+# (burst, tokens refilled per minute)
+DEFAULT_IP_BUCKET = (10, 10)
+DEFAULT_EMAIL_IP_BUCKET = (5, 2)
+DEFAULT_EMAIL_BUCKET = (20, 4)
+
+DEFAULT_THROTTLE_CACHE = "default"
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+class LoginBusy(Exception):
+    """Too many password checks are already queued; the attempt was not hashed."""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "LOGIN_HASH_WORKERS", DEFAULT_HASH_WORKERS),
+                thread_name_prefix="login-hash",
+            )
+        return _executor
+
+
+async def acheck_password(password, encoded):
+    """
+    ``check_password`` on the bounded login hashing pool. Raises
+    :class:`LoginBusy` instead of queueing once
+    ``LOGIN_HASH_MAX_PENDING`` checks are waiting or running.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= getattr(settings, "LOGIN_HASH_MAX_PENDING", DEFAULT_HASH_MAX_PENDING):
+            raise LoginBusy()
+        _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), check_password, password, encoded)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+def throttle_cache():
+    """
+    The ``LOGIN_THROTTLE_CACHE`` alias. A per-process cache such as
+    LocMemCache gives every worker process its own buckets, multiplying
+    the limits by the number of processes.
+    """
+    return caches[getattr(settings, "LOGIN_THROTTLE_CACHE", DEFAULT_THROTTLE_CACHE)]
+
+
+def _bucket_key(scope, value):
+    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()
+    return f"dashboard:login-throttle:{scope}:{digest}"
+
+
+async def atake_token(scope, value, burst, per_minute, charge=True):
+    """
+    Take one token from the ``scope``/``value`` bucket. Returns ``0`` when
+    allowed, otherwise the seconds until a token is available. With
+    ``charge=False`` the bucket is only checked and nothing is taken.
+
+    The bucket is a ``(tokens, updated_at)`` pair in the cache; concurrent
+    attempts can race on it, so the limit is approximate under bursts.
+    """
+    cache = throttle_cache()
+    key = _bucket_key(scope, value)
+    rate = per_minute / 60
+    now = time.time()
+    tokens, updated_at = await cache.aget(key) or (burst, now)
+    tokens = min(burst, tokens + (now - updated_at) * rate)
+    if tokens < 1:
+        return math.ceil((1 - tokens) / rate)
+    if charge:
+        # Kept until the bucket would be full again.
+        await cache.aset(key, (tokens - 1, now), math.ceil(burst / rate))
+    return 0
+
+
+def client_ip(request):
+    # REMOTE_ADDR only: X-Forwarded-For is client-controlled unless a trusted
+    # proxy rewrites it.
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _failure_buckets(request, email):
+    """
+    ``(scope, value, burst, per_minute)`` for the buckets charged by failed
+    logins: one per email and client IP, and one per email alone that caps
+    guesses against an account across every address. The per-email burst
+    is higher so failures from elsewhere rarely lock the owner out.
+    """
+    email_ip_burst, email_ip_rate = getattr(settings, "LOGIN_THROTTLE_EMAIL_IP", DEFAULT_EMAIL_IP_BUCKET)
+    email_burst, email_rate = getattr(settings, "LOGIN_THROTTLE_EMAIL", DEFAULT_EMAIL_BUCKET)
+    return (
+        ("email-ip", f"{email}|{client_ip(request)}", email_ip_burst, email_ip_rate),
+        ("email", email, email_burst, email_rate),
+    )
+
+
+async def athrottle_login(request, email):
+    """
+    Charge a login attempt to the client IP bucket and check the two email
+    buckets (per email and IP, and per email). Returns ``0`` when the attempt may proceed,
+    otherwise the ``Retry-After`` seconds.
+
+    The email buckets are only charged by failed attempts
+    (:func:`arecord_login_failure`) and cleared by a successful login
+    (:func:`areset_login_failures`), so correct logins never use them up.
+    """
+    ip_burst, ip_rate = getattr(settings, "LOGIN_THROTTLE_IP", DEFAULT_IP_BUCKET)
+    retry_after = await atake_token("ip", client_ip(request), ip_burst, ip_rate)
+    if retry_after:
+        return retry_after
+    for scope, value, burst, per_minute in _failure_buckets(request, email):
+        retry_after = await atake_token(scope, value, burst, per_minute, charge=False)
+        if retry_after:
+            return retry_after
+    return 0
+
+
+async def arecord_login_failure(request, email):
+    for scope, value, burst, per_minute in _failure_buckets(request, email):
+        await atake_token(scope, value, burst, per_minute)
+
+
+async def areset_login_failures(request, email):
+    cache = throttle_cache()
+    for scope, value, _burst, _per_minute in _failure_buckets(request, email):
+        await cache.adelete(_bucket_key(scope, value))
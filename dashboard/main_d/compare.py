@@ -0,0 +1,297 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.utils import timezone
+
+from ..models import Project
+from ..reporting.metrics import instrumented_report, record_rows, report_phase
+from ..reporting.pdf import (
+    HAS_REPORTLAB,
+    data_table,
+    divider,
+    footer_note,
+    render_pdf,
+    report_header,
+    reportlab_missing_response,
+    section_heading,
+    spacer,
+    summary_cards,
+)
+from ..reporting.pool import pooled_pdf_response
+from ..reporting.snapshot import department_snapshot
+from ..reporting.xlsx import HAS_OPENPYXL, ReportWorkbook, openpyxl_missing_response
+
+
+def signed_money(value):
+    sign = "+" if value > 0 else "-" if value < 0 else ""
+    return f"{sign}Rs {abs(Decimal(value)):,.2f}"
+
+
+def signed_count(value):
+    return f"{value:+d}" if value else "0"
+
+
+def percent_change(current, baseline):
+    if not baseline:
+        return "-" if not current else "new"
+    return f"{(Decimal(current) - Decimal(baseline)) / Decimal(baseline) * 100:+.1f}%"
+
+
+def _window_figures(snapshot, start_date, end_date):
+    projects = snapshot.projects_for(start_date=start_date, end_date=end_date)
+    category_counts = Counter(project.category for project in projects)
+    category_revenue = defaultdict(lambda: Decimal("0.00"))
+    for project in projects:
+        if project.amount is not None:
+            category_revenue[project.category] += Decimal(project.amount)
+    return {
+        "project_count": len(projects),
+        "revenue": snapshot.total_amount(projects),
+        "category_counts": category_counts,
+        "category_revenue": category_revenue,
+        "status_counts": Counter(project.status for project in projects),
+        "income": snapshot.worker_income(projects),
+    }
+
+
+def build_comparison_report_data(dept, current, baseline):
+    """
+    Compare two ``(start_date, end_date)`` windows: revenue and project
+    counts, per category and per status, and each worker's income. Both
+    windows are sliced from one department snapshot.
+    """
+    snapshot = department_snapshot(dept)
+    now = _window_figures(snapshot, *current)
+    then = _window_figures(snapshot, *baseline)
+
+    category_rows = [
+        {
+            "category": label,
+            "current_count": now["category_counts"][key],
+            "baseline_count": then["category_counts"][key],
+            "count_delta": now["category_counts"][key] - then["category_counts"][key],
+            "current_revenue": now["category_revenue"][key],
+            "baseline_revenue": then["category_revenue"][key],
+            "revenue_delta": now["category_revenue"][key] - then["category_revenue"][key],
+        }
+        for key, label in Project.PROJECT_CATEGORY
+    ]
+    status_rows = [
+        {
+            "status": label,
+            "current_count": now["status_counts"][key],
+            "baseline_count": then["status_counts"][key],
+            "count_delta": now["status_counts"][key] - then["status_counts"][key],
+        }
+        for key, label in Project.PROJECT_STATUS
+    ]
+
+    worker_rows = []
+    for worker in snapshot.workers:
+        current_income = now["income"].get(worker.id, Decimal("0.00"))
+        baseline_income = then["income"].get(worker.id, Decimal("0.00"))
+        if current_income <= 0 and baseline_income <= 0:
+            continue
+        worker_rows.append(
+            {
+                "name": worker.name,
+                "email": worker.email or "-",
+                "current_income": current_income,
+                "baseline_income": baseline_income,
+                "income_delta": current_income - baseline_income,
+            }
+        )
+
+    return {
+        "department_name": dept.name,
+        "current_label": f"{current[0]:%Y-%m-%d} to {current[1]:%Y-%m-%d}",
+        "baseline_label": f"{baseline[0]:%Y-%m-%d} to {baseline[1]:%Y-%m-%d}",
+        "current_revenue": now["revenue"],
+        "baseline_revenue": then["revenue"],
+        "revenue_delta": now["revenue"] - then["revenue"],
+        "current_project_count": now["project_count"],
+        "baseline_project_count": then["project_count"],
+        "project_count_delta": now["project_count"] - then["project_count"],
+        "category_rows": category_rows,
+        "status_rows": status_rows,
+        "worker_rows": worker_rows,
+        "generated_at": timezone.localtime().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _category_table(report):
+    return [
+        [
+            item["category"],
+            str(item["current_count"]),
+            str(item["baseline_count"]),
+            signed_count(item["count_delta"]),
+            f"Rs {item['current_revenue']:,.2f}",
+            f"Rs {item['baseline_revenue']:,.2f}",
+            signed_money(item["revenue_delta"]),
+        ]
+        for item in report["category_rows"]
+    ]
+
+
+def _status_table(report):
+    return [
+        [item["status"], str(item["current_count"]), str(item["baseline_count"]), signed_count(item["count_delta"])]
+        for item in report["status_rows"]
+    ]
+
+
+def _worker_table(report):
+    return [
+        [
+            str(idx),
+            item["name"],
+            item["email"],
+            f"Rs {item['current_income']:,.2f}",
+            f"Rs {item['baseline_income']:,.2f}",
+            signed_money(item["income_delta"]),
+            percent_change(item["current_income"], item["baseline_income"]),
+        ]
+        for idx, item in enumerate(report["worker_rows"], start=1)
+    ]
+
+
+CATEGORY_HEADERS = ["Category", "Current Projects", "Baseline Projects", "Change", "Current Revenue", "Baseline Revenue", "Change"]
+STATUS_HEADERS = ["Status", "Current Projects", "Baseline Projects", "Change"]
+WORKER_HEADERS = ["#", "Name", "Email", "Current Income", "Baseline Income", "Change", "Change %"]
+
+
+@instrumented_report("comparison", "csv")
+def generate_comparison_csv_report(dept, current, baseline):
+    if not HAS_OPENPYXL:
+        return openpyxl_missing_response()
+
+    with report_phase("build"):
+        report = build_comparison_report_data(dept, current, baseline)
+    workbook = ReportWorkbook()
+    sheet = workbook.add_sheet("Comparison", [22, 26, 30, 18, 18, 18, 18])
+
+    summary_rows = [
+        ("Department Name", report["department_name"]),
+        ("Current Period", report["current_label"]),
+        ("Baseline Period", report["baseline_label"]),
+        ("Generated At", report["generated_at"]),
+    ]
+    for label, value in summary_rows:
+        sheet.append([label, value], styles=["report_label", "report_value"])
+
+    sheet.blank()
+    sheet.append_title("Table 1: Revenue And Projects")
+    sheet.header(["Measure", "Current", "Baseline", "Change", "Change %"], style="report_label")
+    sheet.append(
+        [
+            "Revenue",
+            f"Rs {report['current_revenue']:,.2f}",
+            f"Rs {report['baseline_revenue']:,.2f}",
+            signed_money(report["revenue_delta"]),
+            percent_change(report["current_revenue"], report["baseline_revenue"]),
+        ]
+    )
+    sheet.append(
+        [
+            "Projects",
+            report["current_project_count"],
+            report["baseline_project_count"],
+            signed_count(report["project_count_delta"]),
+            percent_change(report["current_project_count"], report["baseline_project_count"]),
+        ]
+    )
+
+    sheet.blank()
+    sheet.append_title("Table 2: Projects By Category")
+    sheet.header(CATEGORY_HEADERS, style="report_label")
+    for row in _category_table(report):
+        sheet.append(row)
+
+    sheet.blank()
+    sheet.append_title("Table 3: Projects By Status")
+    sheet.header(STATUS_HEADERS, style="report_label")
+    for row in _status_table(report):
+        sheet.append(row)
+
+    sheet.blank()
+    sheet.append_title("Table 4: Worker Income")
+    sheet.header(WORKER_HEADERS, style="report_label")
+    for row in _worker_table(report):
+        sheet.append(row, wrap_columns=(2, 3))
+
+    return workbook.response("period_comparison_report.xlsx")
+
+
+def render_comparison_pdf(report):
+    story = [
+        *report_header(
+            f"{report['department_name']} comparison",
+            f"{report['current_label']} vs {report['baseline_label']}",
+            subtitle_size=12,
+        ),
+        section_heading("Summary"),
+        summary_cards(
+            [
+                ("Current Revenue", f"Rs {report['current_revenue']:,.2f}"),
+                ("Baseline Revenue", f"Rs {report['baseline_revenue']:,.2f}"),
+                (
+                    "Revenue Change",
+                    f"{signed_money(report['revenue_delta'])} "
+                    f"({percent_change(report['current_revenue'], report['baseline_revenue'])})",
+                ),
+                ("Current Projects", report["current_project_count"]),
+                ("Baseline Projects", report["baseline_project_count"]),
+                ("Project Change", signed_count(report["project_count_delta"])),
+            ],
+            value_size=12,
+        ),
+        *divider(before=12),
+        section_heading("Projects By Category"),
+        *data_table(
+            CATEGORY_HEADERS,
+            _category_table(report),
+            [0.14, 0.12, 0.12, 0.10, 0.18, 0.18, 0.16],
+            preset="compact",
+            bold_column=0,
+        ),
+        spacer(12),
+        section_heading("Projects By Status"),
+        *data_table(
+            STATUS_HEADERS,
+            _status_table(report),
+            [0.31, 0.23, 0.23, 0.23],
+            preset="compact",
+            bold_column=0,
+        ),
+        spacer(12),
+        section_heading("Worker Income"),
+        *data_table(
+            WORKER_HEADERS,
+            _worker_table(report),
+            [0.05, 0.17, 0.24, 0.15, 0.15, 0.14, 0.10],
+            preset="compact",
+            bold_column=1,
+        ),
+        spacer(12),
+        footer_note(
+            f"Comparison report generated for <b>{report['department_name']}</b>: "
+            f"{report['current_label']} against {report['baseline_label']}."
+        ),
+    ]
+    return render_pdf(
+        story,
+        title="Period Comparison Report",
+        author=report["department_name"],
+        footer_label=f"Period Comparison Report  |  {report['department_name']}",
+    )
+
+
+@instrumented_report("comparison", "pdf")
+def generate_comparison_pdf_report(dept, current, baseline):
+    if not HAS_REPORTLAB:
+        return reportlab_missing_response()
+    with report_phase("build"):
+        report = build_comparison_report_data(dept, current, baseline)
+    record_rows(len(report["category_rows"]) + len(report["status_rows"]) + len(report["worker_rows"]))
+    return pooled_pdf_response(render_comparison_pdf, report, "period_comparison_report.pdf")
@@ -1,71 +1,35 @@
 from decimal import Decimal
-from io import BytesIO
-import os
 
-from django.http import HttpResponse, JsonResponse
 from django.db.models import Sum
 from django.utils import timezone
 
-
-def _calculate_project_payments(project):
-    if not project.amount:
-        return {}
-
-    members = list(project.members.select_related("worker"))
-    gold = [m for m in members if m.contribution == "gold"]
-    silver = [m for m in members if m.contribution == "silver"]
-    copper = [m for m in members if m.contribution == "copper"]
-    total_amount = Decimal(project.amount)
-    payments = {}
-
-    if gold and not silver and not copper:
-        share = total_amount / len(gold)
-        for member in gold:
-            payments[member.id] = share
-    elif gold and silver and not copper:
-        gold_total = total_amount * Decimal("0.60")
-        silver_total = total_amount * Decimal("0.40")
-        for member in gold:
-            payments[member.id] = gold_total / len(gold)
-        for member in silver:
-            payments[member.id] = silver_total / len(silver)
-    elif gold and copper and not silver:
-        gold_total = total_amount * Decimal("0.70")
-        copper_total = total_amount * Decimal("0.30")
-        for member in gold:
-            payments[member.id] = gold_total / len(gold)
-        for member in copper:
-            payments[member.id] = copper_total / len(copper)
-    else:
-        weight_map = {"gold": 3, "silver": 2, "copper": 1}
-        total_weight = sum(weight_map[m.contribution] for m in members)
-        for member in members:
-            share = (Decimal(weight_map[member.contribution]) / Decimal(total_weight)) * total_amount
-            payments[member.id] = share
-
-    return payments
+from ..aggregates import worker_aggregates
+from ..project_d.rows import iter_project_rows
+from ..reporting.metrics import instrumented_report, record_rows, report_phase
+from ..reporting.pdf import (
+    HAS_REPORTLAB,
+    data_table,
+    divider,
+    footer_note,
+    render_pdf,
+    report_header,
+    reportlab_missing_response,
+    section_heading,
+    spacer,
+    summary_cards,
+)
+from ..reporting.pool import pooled_pdf_response
+from ..reporting.snapshot import department_snapshot
+from ..reporting.streaming import STREAM_CHUNK_SIZE, money, streaming_csv_response
+from ..reporting.xlsx import HAS_OPENPYXL, ReportWorkbook, openpyxl_missing_response
 
 
 def build_main_report_data(dept):
-    projects = (
-        dept.projects.all()
-        .prefetch_related("members__worker")
-        .order_by("-start_date", "-id")
-    )
-    workers = dept.workers.all().order_by("name")
-
-    total_income = (
-        projects.aggregate(total=Sum("amount"))["total"]
-        or Decimal("0.00")
-    )
-    total_project_count = projects.count()
-    total_workers = workers.count()
+    snapshot = department_snapshot(dept)
+    income_map = snapshot.worker_income()
 
     project_rows = []
-    for project in projects:
-        assigned_worker_names = ", ".join(
-            sorted({m.worker.name for m in project.members.all()})
-        ) or "-"
+    for project in snapshot.projects:
         project_rows.append(
             {
                 "project_name": project.title,
@@ -73,467 +37,195 @@ def build_main_report_data(dept):
                 "category": project.get_category_display(),
                 "status": project.get_status_display(),
                 "amount": Decimal(project.amount or Decimal("0.00")),
-                "assigned_workers": assigned_worker_names,
+                "assigned_workers": ", ".join(sorted(set(snapshot.worker_names(project)))) or "-",
             }
         )
 
-    worker_income_map = {worker.id: Decimal("0.00") for worker in workers}
-    for project in projects:
-        payments = _calculate_project_payments(project)
-        for member in project.members.all():
-            worker_income_map[member.worker_id] = (
-                worker_income_map.get(member.worker_id, Decimal("0.00")) + payments.get(member.id, Decimal("0.00"))
-            )
-
     worker_rows = []
-    for worker in workers:
+    for worker in snapshot.workers:
         worker_rows.append(
             {
                 "name": worker.name,
                 "email": worker.email or "-",
                 "date_of_join": worker.date_of_join.strftime("%Y-%m-%d"),
                 "posting": worker.posting,
-                "income_by_user": worker_income_map.get(worker.id, Decimal("0.00")),
+                "income_by_user": income_map.get(worker.id, Decimal("0.00")),
             }
         )
 
     return {
         "department_name": dept.name,
-        "total_income": total_income,
-        "total_workers": total_workers,
-        "total_project_count": total_project_count,
+        "total_income": snapshot.total_amount(snapshot.projects),
+        "total_workers": len(snapshot.workers),
+        "total_project_count": len(snapshot.projects),
         "project_rows": project_rows,
         "worker_rows": worker_rows,
         "generated_at": timezone.localtime().strftime("%Y-%m-%d %H:%M:%S"),
     }
 
 
-def generate_main_csv_report(dept):
-    try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill
-        has_openpyxl = True
-    except ImportError:
-        has_openpyxl = False
-
-    if not has_openpyxl:
-        return JsonResponse(
-            {"detail": "Excel generation dependency missing. Install openpyxl."},
-            status=500,
-        )
-
-    report = build_main_report_data(dept)
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Main Report"
-
-    ws.column_dimensions["A"].width = 12
-    ws.column_dimensions["B"].width = 32
-    ws.column_dimensions["C"].width = 40
-    ws.column_dimensions["D"].width = 18
-    ws.column_dimensions["E"].width = 16
-    ws.column_dimensions["F"].width = 18
-    ws.column_dimensions["G"].width = 44
-    header_fill = PatternFill("solid", fgColor="2E5FA3")
-    header_font = Font(bold=True, color="FFFFFF")
-
-    summary_rows = [
-        ("Department", report["department_name"]),
-        ("Total Income", f"Rs {report['total_income']:,.2f}"),
-        ("Total Workers", str(report["total_workers"])),
-        ("Total Project Count", str(report["total_project_count"])),
-        ("Generated At", report["generated_at"]),
-    ]
-
-    row_idx = 1
-    ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=7)
-    dept_key_cell = ws.cell(row=row_idx, column=1, value=summary_rows[0][0])
-    dept_key_cell.font = Font(bold=True)
-    dept_key_cell.alignment = Alignment(horizontal="left", vertical="center")
-    row_idx += 1
-    ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=7)
-    dept_val_cell = ws.cell(row=row_idx, column=1, value=summary_rows[0][1])
-    dept_val_cell.alignment = Alignment(horizontal="left", vertical="center")
-    row_idx += 2
-
-    for label, value in summary_rows[1:]:
-        ws.cell(row=row_idx, column=1, value=label).font = Font(bold=True)
-        ws.merge_cells(start_row=row_idx, start_column=2, end_row=row_idx, end_column=7)
-        ws.cell(row=row_idx, column=2, value=value).alignment = Alignment(horizontal="left", vertical="center")
-        row_idx += 1
-
-    row_idx += 1
-    ws.cell(row=row_idx, column=1, value="Table 1: Project List").font = Font(bold=True)
-    row_idx += 1
-    headers_1 = ["#", "Project Name", "Start Date", "Category", "Status", "Amount", "Assigned Workers"]
-    for col_idx, header in enumerate(headers_1, start=1):
-        cell = ws.cell(row=row_idx, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="left", vertical="center")
-    row_idx += 1
-
-    for index, item in enumerate(report["project_rows"], start=1):
-        ws.cell(row=row_idx, column=1, value=index)
-        ws.cell(row=row_idx, column=2, value=item["project_name"])
-        ws.cell(row=row_idx, column=3, value=item["start_date"])
-        ws.cell(row=row_idx, column=4, value=item["category"])
-        ws.cell(row=row_idx, column=5, value=item["status"])
-        ws.cell(row=row_idx, column=6, value=f"Rs {Decimal(item['amount']):,.2f}")
-        ws.cell(row=row_idx, column=7, value=item["assigned_workers"])
-        for col_idx in range(1, 8):
-            ws.cell(row=row_idx, column=col_idx).alignment = Alignment(
-                horizontal="left", vertical="center", wrap_text=(col_idx in [2, 7])
-            )
-        row_idx += 1
-
-    row_idx += 1
-    ws.cell(row=row_idx, column=1, value="Table 2: Workers List").font = Font(bold=True)
-    row_idx += 1
-    headers_2 = ["#", "Name", "Email", "Date Of Join", "Posting", "Income By User"]
-    for col_idx, header in enumerate(headers_2, start=1):
-        cell = ws.cell(row=row_idx, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="left", vertical="center")
-    row_idx += 1
-
-    for index, item in enumerate(report["worker_rows"], start=1):
-        ws.cell(row=row_idx, column=1, value=index)
-        ws.cell(row=row_idx, column=2, value=item["name"])
-        ws.cell(row=row_idx, column=3, value=item["email"])
-        ws.cell(row=row_idx, column=4, value=item["date_of_join"])
-        ws.cell(row=row_idx, column=5, value=item["posting"])
-        ws.cell(row=row_idx, column=6, value=f"Rs {Decimal(item['income_by_user']):,.2f}")
-        for col_idx in range(1, 7):
-            ws.cell(row=row_idx, column=col_idx).alignment = Alignment(
-                horizontal="left", vertical="center", wrap_text=(col_idx in [2, 5])
-            )
-        row_idx += 1
-
-    ws.freeze_panes = "A11"
-
-    output = BytesIO()
-    wb.save(output)
-    payload = output.getvalue()
-    output.close()
-
-    response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    response["Content-Disposition"] = 'attachment; filename="main_overall_report.xlsx"'
-    response.write(payload)
-    return response
-
-
-def generate_main_pdf_report(dept):
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import mm
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
-        from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-    except ImportError:
-        return HttpResponse(
-            "PDF generation dependency is missing. Install reportlab.",
-            status=500,
-            content_type="text/plain",
-        )
+def _main_summary(dept):
+    return {
+        "department_name": dept.name,
+        "total_income": dept.projects.aggregate(total=Sum("amount"))["total"] or Decimal("0.00"),
+        "total_workers": dept.workers.count(),
+        "total_project_count": dept.projects.count(),
+        "generated_at": timezone.localtime().strftime("%Y-%m-%d %H:%M:%S"),
+    }
 
-    report = build_main_report_data(dept)
 
-    font_name = "Helvetica"
-    bold_font_name = "Helvetica-Bold"
-    for path in [
-        "C:/Windows/Fonts/arial.ttf",
-        "C:/Windows/Fonts/calibri.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-    ]:
-        if os.path.exists(path):
-            try:
-                pdfmetrics.registerFont(TTFont("ReportSans", path))
-                font_name = "ReportSans"
-                bold_font_name = "ReportSans"
-                break
-            except Exception:
-                pass
+def _iter_project_table(dept):
+    """Yield ``(index, title, start_date, category, status, amount, assigned_workers)``."""
+    project_rows = iter_project_rows(dept.projects.order_by("-start_date", "-id"), chunk_size=STREAM_CHUNK_SIZE)
+    for index, (_id, title, start_date, category, status, amount, worker_names) in enumerate(project_rows, start=1):
+        yield index, title, start_date.strftime("%Y-%m-%d"), category, status, amount, ", ".join(sorted(set(worker_names))) or "-"
 
-    BRAND_DARK = colors.HexColor("#1A2B4A")
-    BRAND_MID = colors.HexColor("#2E5FA3")
-    BRAND_LIGHT = colors.HexColor("#E8F0FB")
-    ACCENT = colors.HexColor("#F0A500")
-    WHITE = colors.white
-    GREY_TEXT = colors.HexColor("#4A4A4A")
-    ROW_ALT = colors.HexColor("#EEF3FB")
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        leftMargin=10 * mm,
-        rightMargin=10 * mm,
-        topMargin=12 * mm,
-        bottomMargin=12 * mm,
-        title="Main Overall Report",
-        author=report["department_name"],
+def _iter_worker_table(dept):
+    """Yield ``(index, name, email, date_of_join, posting, income)``."""
+    income_map = worker_aggregates(dept)
+    worker_rows = (
+        dept.workers.order_by("name")
+        .values_list("id", "name", "email", "date_of_join", "posting")
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
     )
-    page_w = A4[0] - 20 * mm
+    for index, (worker_id, name, email, date_of_join, posting) in enumerate(worker_rows, start=1):
+        income = income_map.get(worker_id, {}).get("income", Decimal("0.00"))
+        yield index, name, email or "-", date_of_join.strftime("%Y-%m-%d"), posting, income
 
-    def style(name, **kwargs):
-        return ParagraphStyle(name, **kwargs)
 
-    getSampleStyleSheet()
+@instrumented_report("main", "csv")
+def generate_main_csv_report(dept):
+    if not HAS_OPENPYXL:
+        return openpyxl_missing_response()
+
+    with report_phase("build"):
+        report = _main_summary(dept)
+    workbook = ReportWorkbook()
+    sheet = workbook.add_sheet("Main Report", [12, 32, 40, 18, 16, 18, 44], freeze_panes="A11")
+
+    sheet.append_title("Department", last_column=7)
+    sheet.append([report["department_name"]])
+    sheet.merge(1, 7)
+    sheet.blank()
+    sheet.append_merged("Total Income", f"Rs {report['total_income']:,.2f}", 7)
+    sheet.append_merged("Total Workers", str(report["total_workers"]), 7)
+    sheet.append_merged("Total Project Count", str(report["total_project_count"]), 7)
+    sheet.append_merged("Generated At", report["generated_at"], 7)
+
+    sheet.blank()
+    sheet.append_title("Table 1: Project List")
+    sheet.header(["#", "Project Name", "Start Date", "Category", "Status", "Amount", "Assigned Workers"])
+    for index, title, start_date, category, status, amount, assigned_workers in _iter_project_table(dept):
+        sheet.append(
+            [index, title, start_date, category, status, f"Rs {Decimal(amount):,.2f}", assigned_workers],
+            wrap_columns=(2, 7),
+        )
 
-    s_report_title = style(
-        "ReportTitle",
-        fontName=bold_font_name, fontSize=22,
-        textColor=WHITE, alignment=TA_LEFT,
-        spaceAfter=0, spaceBefore=0, leading=24,
-    )
-    s_report_subtitle = style(
-        "ReportSubtitle",
-        fontName=bold_font_name, fontSize=16,
-        textColor=ACCENT, alignment=TA_RIGHT,
-        spaceAfter=0, spaceBefore=0, leading=18,
-    )
-    s_section_heading = style(
-        "SectionHeading",
-        fontName=bold_font_name, fontSize=11,
-        textColor=BRAND_DARK, spaceBefore=14, spaceAfter=4,
-    )
-    s_label = style(
-        "Label",
-        fontName=bold_font_name, fontSize=9,
-        textColor=BRAND_DARK,
-    )
-    s_table_header = style(
-        "TableHeader",
-        fontName=bold_font_name, fontSize=9,
-        textColor=WHITE, alignment=TA_LEFT,
-    )
-    s_table_cell = style(
-        "TableCell",
-        fontName=bold_font_name, fontSize=8.8,
-        textColor=GREY_TEXT, leading=11,
-    )
-    s_table_cell_bold = style(
-        "TableCellBold",
-        fontName=bold_font_name, fontSize=8.8,
-        textColor=BRAND_DARK, leading=11,
-    )
+    sheet.blank()
+    sheet.append_title("Table 2: Workers List")
+    sheet.header(["#", "Name", "Email", "Date Of Join", "Posting", "Income By User"])
+    for index, name, email, date_of_join, posting, income in _iter_worker_table(dept):
+        sheet.append(
+            [index, name, email, date_of_join, posting, f"Rs {Decimal(income):,.2f}"],
+            wrap_columns=(2, 5),
+        )
 
-    header_table = Table(
-        [[
-            Paragraph(f"{report['department_name']} report", s_report_title),
-            Paragraph("Redback", s_report_subtitle),
-        ]],
-        colWidths=[page_w * 0.7, page_w * 0.3],
-    )
-    header_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), BRAND_DARK),
-        ("TOPPADDING", (0, 0), (-1, -1), 14),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
-        ("LEFTPADDING", (0, 0), (-1, -1), 16),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 16),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("ALIGN", (0, 0), (0, 0), "LEFT"),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-    ]))
+    return workbook.response("main_overall_report.xlsx")
 
-    accent_bar = Table([[""]], colWidths=[page_w], rowHeights=[4])
-    accent_bar.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), ACCENT),
-        ("TOPPADDING", (0, 0), (-1, -1), 0),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
-    ]))
 
-    def summary_card(label, value):
-        return [
-            Paragraph(label, s_label),
-            Paragraph(
-                str(value),
-                style(
-                    "CardVal",
-                    fontName=bold_font_name,
-                    fontSize=13,
-                    textColor=BRAND_MID,
-                    spaceAfter=0,
-                ),
-            ),
+def render_main_pdf(report):
+    project_rows = [
+        [
+            str(idx),
+            item["project_name"],
+            item["start_date"],
+            item["category"],
+            item["status"],
+            f"Rs {Decimal(item['amount']):,.2f}",
+            item["assigned_workers"],
         ]
-
-    summary_table = Table(
-        [[
-            summary_card("Total Income", f"Rs {report['total_income']:,.2f}"),
-            summary_card("Total Workers", str(report["total_workers"])),
-            summary_card("Total Project Count", str(report["total_project_count"])),
-        ]],
-        colWidths=[page_w / 3] * 3,
-    )
-    summary_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), BRAND_LIGHT),
-        ("TOPPADDING", (0, 0), (-1, -1), 12),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-        ("LEFTPADDING", (0, 0), (-1, -1), 14),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 14),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LINEAFTER", (0, 0), (1, 0), 0.5, colors.HexColor("#B0C4E8")),
-    ]))
-
-    project_table_rows = [[
-        Paragraph("#", s_table_header),
-        Paragraph("Project Name", s_table_header),
-        Paragraph("Start Date", s_table_header),
-        Paragraph("Category", s_table_header),
-        Paragraph("Status", s_table_header),
-        Paragraph("Amount", s_table_header),
-        Paragraph("Assigned Workers", s_table_header),
-    ]]
-    for idx, item in enumerate(report["project_rows"], start=1):
-        project_table_rows.append([
-            Paragraph(str(idx), s_table_cell),
-            Paragraph(item["project_name"], s_table_cell_bold),
-            Paragraph(item["start_date"], s_table_cell),
-            Paragraph(item["category"], s_table_cell),
-            Paragraph(item["status"], s_table_cell),
-            Paragraph(f"Rs {Decimal(item['amount']):,.2f}", s_table_cell),
-            Paragraph(item["assigned_workers"], s_table_cell),
-        ])
-
-    project_row_bg = []
-    for r in range(1, len(project_table_rows)):
-        project_row_bg.append(("BACKGROUND", (0, r), (-1, r), ROW_ALT if r % 2 == 0 else WHITE))
-
-    project_table = Table(
-        project_table_rows,
-        colWidths=[
-            page_w * 0.05,
-            page_w * 0.20,
-            page_w * 0.11,
-            page_w * 0.11,
-            page_w * 0.11,
-            page_w * 0.11,
-            page_w * 0.31,
-        ],
-        repeatRows=1,
-    )
-    project_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), BRAND_MID),
-        ("TOPPADDING", (0, 0), (-1, 0), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 1), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 1), (-1, -1), 6),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LINEBELOW", (0, 0), (-1, -1), 0.3, colors.HexColor("#D0DCF0")),
-        ("LINEBELOW", (0, 0), (-1, 0), 0, WHITE),
-        ("BOX", (0, 0), (-1, -1), 0.8, BRAND_MID),
-        *project_row_bg,
-    ]))
-
-    worker_table_rows = [[
-        Paragraph("#", s_table_header),
-        Paragraph("Name", s_table_header),
-        Paragraph("Email", s_table_header),
-        Paragraph("Date Of Join", s_table_header),
-        Paragraph("Posting", s_table_header),
-        Paragraph("Income By User", s_table_header),
-    ]]
-    for idx, item in enumerate(report["worker_rows"], start=1):
-        worker_table_rows.append([
-            Paragraph(str(idx), s_table_cell),
-            Paragraph(item["name"], s_table_cell_bold),
-            Paragraph(item["email"], s_table_cell),
-            Paragraph(item["date_of_join"], s_table_cell),
-            Paragraph(item["posting"], s_table_cell),
-            Paragraph(f"Rs {Decimal(item['income_by_user']):,.2f}", s_table_cell),
-        ])
-
-    worker_row_bg = []
-    for r in range(1, len(worker_table_rows)):
-        worker_row_bg.append(("BACKGROUND", (0, r), (-1, r), ROW_ALT if r % 2 == 0 else WHITE))
-
-    worker_table = Table(
-        worker_table_rows,
-        colWidths=[
-            page_w * 0.06,
-            page_w * 0.17,
-            page_w * 0.30,
-            page_w * 0.14,
-            page_w * 0.16,
-            page_w * 0.17,
-        ],
-        repeatRows=1,
-    )
-    worker_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), BRAND_MID),
-        ("TOPPADDING", (0, 0), (-1, 0), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 1), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 1), (-1, -1), 6),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LINEBELOW", (0, 0), (-1, -1), 0.3, colors.HexColor("#D0DCF0")),
-        ("LINEBELOW", (0, 0), (-1, 0), 0, WHITE),
-        ("BOX", (0, 0), (-1, -1), 0.8, BRAND_MID),
-        *worker_row_bg,
-    ]))
-
-    footer_note = Paragraph(
-        f"Generated for <b>{report['department_name']}</b> on {report['generated_at']}.",
-        style(
-            "Footer",
-            fontName=font_name,
-            fontSize=8,
-            textColor=colors.HexColor("#888888"),
-            alignment=TA_CENTER,
-        ),
-    )
-
-    def add_page_footer(canvas_obj, doc_obj):
-        canvas_obj.saveState()
-        canvas_obj.setFont(font_name, 8)
-        canvas_obj.setFillColor(colors.HexColor("#AAAAAA"))
-        canvas_obj.drawString(
-            10 * mm, 10 * mm,
-            f"Main Overall Report  |  {report['department_name']}"
-        )
-        canvas_obj.drawRightString(
-            A4[0] - 10 * mm, 10 * mm,
-            f"Page {doc_obj.page}"
-        )
-        canvas_obj.setStrokeColor(colors.HexColor("#DDDDDD"))
-        canvas_obj.line(10 * mm, 13 * mm, A4[0] - 10 * mm, 13 * mm)
-        canvas_obj.restoreState()
+        for idx, item in enumerate(report["project_rows"], start=1)
+    ]
+    worker_rows = [
+        [
+            str(idx),
+            item["name"],
+            item["email"],
+            item["date_of_join"],
+            item["posting"],
+            f"Rs {Decimal(item['income_by_user']):,.2f}",
+        ]
+        for idx, item in enumerate(report["worker_rows"], start=1)
+    ]
 
     story = [
-        header_table,
-        accent_bar,
-        Spacer(1, 10),
-        Paragraph("Summary Cards", s_section_heading),
-        summary_table,
-        Spacer(1, 14),
-        HRFlowable(width="100%", thickness=0.5, color=colors.HexColor("#D0DCF0")),
-        Spacer(1, 6),
-        Paragraph("Table 1: Project List", s_section_heading),
-        project_table,
-        Spacer(1, 12),
-        Paragraph("Table 2: Workers List", s_section_heading),
-        worker_table,
-        Spacer(1, 14),
-        HRFlowable(width="100%", thickness=0.5, color=colors.HexColor("#DDDDDD")),
-        Spacer(1, 6),
-        footer_note,
+        *report_header(f"{report['department_name']} report", "Redback"),
+        section_heading("Summary Cards"),
+        summary_cards(
+            [
+                ("Total Income", f"Rs {report['total_income']:,.2f}"),
+                ("Total Workers", str(report["total_workers"])),
+                ("Total Project Count", str(report["total_project_count"])),
+            ],
+            value_size=13,
+        ),
+        *divider(),
+        section_heading("Table 1: Project List"),
+        *data_table(
+            ["#", "Project Name", "Start Date", "Category", "Status", "Amount", "Assigned Workers"],
+            project_rows,
+            [0.05, 0.20, 0.11, 0.11, 0.11, 0.11, 0.31],
+            preset="compact",
+            bold_column=1,
+        ),
+        spacer(12),
+        section_heading("Table 2: Workers List"),
+        *data_table(
+            ["#", "Name", "Email", "Date Of Join", "Posting", "Income By User"],
+            worker_rows,
+            [0.06, 0.17, 0.30, 0.14, 0.16, 0.17],
+            preset="compact",
+            bold_column=1,
+        ),
+        *divider(footer=True),
+        footer_note(f"Generated for <b>{report['department_name']}</b> on {report['generated_at']}."),
     ]
-    doc.build(story, onFirstPage=add_page_footer, onLaterPages=add_page_footer)
+    return render_pdf(
+        story,
+        title="Main Overall Report",
+        author=report["department_name"],
+        footer_label=f"Main Overall Report  |  {report['department_name']}",
+    )
 
-    payload = buffer.getvalue()
-    buffer.close()
 
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = 'attachment; filename="main_overall_report.pdf"'
-    response.write(payload)
-    return response
+@instrumented_report("main", "pdf")
+def generate_main_pdf_report(dept):
+    if not HAS_REPORTLAB:
+        return reportlab_missing_response()
+    with report_phase("build"):
+        report = build_main_report_data(dept)
+    record_rows(len(report["project_rows"]) + len(report["worker_rows"]))
+    return pooled_pdf_response(render_main_pdf, report, "main_overall_report.pdf")
+
+
+def stream_main_csv_report(dept):
+    def rows():
+        report = _main_summary(dept)
+        yield ["Department", report["department_name"]]
+        yield ["Total Income", money(report["total_income"])]
+        yield ["Total Workers", report["total_workers"]]
+        yield ["Total Project Count", report["total_project_count"]]
+        yield ["Generated At", report["generated_at"]]
+        yield []
+        yield ["Table 1: Project List"]
+        yield ["#", "Project Name", "Start Date", "Category", "Status", "Amount", "Assigned Workers"]
+        for index, title, start_date, category, status, amount, assigned_workers in _iter_project_table(dept):
+            yield [index, title, start_date, category, status, money(amount), assigned_workers]
+        yield []
+        yield ["Table 2: Workers List"]
+        yield ["#", "Name", "Email", "Date Of Join", "Posting", "Income By User"]
+        for index, name, email, date_of_join, posting, income in _iter_worker_table(dept):
+            yield [index, name, email, date_of_join, posting, money(income)]
+
+    return streaming_csv_response("main_overall_report.csv", rows())
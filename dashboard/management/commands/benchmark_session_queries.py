@@ -0,0 +1,80 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from dashboard.models import Department
+
+
+SESSION_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "django.contrib.sessions.backends.signed_cookies",
+)
+
+LANDING_FRAGMENTS = ("landing_overall", "landing_plot", "landing_teambar")
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the landing htmx fragments as a logged-in department under "
+        "each session engine and report database queries per request, "
+        "separating the session table reads and writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--department", type=int, help="Department id (default: the first one).")
+        parser.add_argument("--rounds", type=int, default=20, help="Times each fragment is requested per engine.")
+
+    def handle(self, *args, **options):
+        departments = Department.objects.order_by("id")
+        if options["department"]:
+            departments = departments.filter(id=options["department"])
+        dept = departments.first()
+        if dept is None:
+            raise CommandError("No department to benchmark.")
+        rounds = max(1, options["rounds"])
+        urls = [reverse(name) for name in LANDING_FRAGMENTS]
+
+        self.stdout.write(f"Department {dept.id}, {len(urls)} fragments x {rounds} rounds per engine")
+        self.stdout.write(f"{'engine':<16} {'queries/req':>12} {'session/req':>12} {'ms/req':>8}")
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for engine in SESSION_ENGINES:
+                with override_settings(SESSION_ENGINE=engine):
+                    queries, session_queries, elapsed = self._measure(dept, urls, rounds)
+                requests = len(urls) * rounds
+                self.stdout.write(
+                    f"{engine.rsplit('.', 1)[-1]:<16} {queries / requests:>12.2f} "
+                    f"{session_queries / requests:>12.2f} {elapsed * 1000 / requests:>8.1f}"
+                )
+
+    def _measure(self, dept, urls, rounds):
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store["department_id"] = dept.id
+        store.save()
+        client = Client(headers={"HX-Request": "true"})
+        client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        try:
+            # Warm the department and aggregate caches so only the session
+            # handling differs between engines.
+            for url in urls:
+                client.get(url)
+
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                for _round in range(rounds):
+                    for url in urls:
+                        response = client.get(url)
+                        if response.status_code != 200:
+                            raise CommandError(f"{url} returned {response.status_code}")
+            elapsed = time.perf_counter() - started
+        finally:
+            store.delete()
+
+        session_queries = sum('"django_session"' in query["sql"] for query in captured.captured_queries)
+        return len(captured.captured_queries), session_queries, elapsed
@@ -0,0 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from dashboard.models import Department
+from dashboard.reporting.jobs import reset_inherited_connections
+from dashboard.reporting.prerender import PRERENDER_FORMATS, prerender_department
+
+
+def _prerender(dept_id, formats, force):
+    try:
+        return prerender_department(dept_id, formats, force)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render the main, team and category reports of every department "
+        "into the report artifact store. Meant to run nightly from cron, e.g. "
+        "`30 2 * * * python manage.py prerender_reports`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "REPORT_PRERENDER_WORKERS", 2),
+            help="Number of worker processes (one department per process at a time).",
+        )
+        parser.add_argument(
+            "--department",
+            type=int,
+            action="append",
+            dest="departments",
+            help="Only this department id (repeatable).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=PRERENDER_FORMATS,
+            action="append",
+            dest="formats",
+            help="Only this format (repeatable). Defaults to both.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Render even when a current artifact already exists.",
+        )
+
+    def handle(self, *args, **options):
+        departments = Department.objects.order_by("id")
+        if options["departments"]:
+            departments = departments.filter(id__in=options["departments"])
+        dept_ids = list(departments.values_list("id", flat=True))
+        formats = tuple(options["formats"] or PRERENDER_FORMATS)
+        workers = max(1, options["workers"])
+
+        totals = {"rendered": 0, "cached": 0, "failed": 0}
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=reset_inherited_connections) as pool:
+            futures = {pool.submit(_prerender, dept_id, formats, options["force"]): dept_id for dept_id in dept_ids}
+            for future in as_completed(futures):
+                dept_id = futures[future]
+                try:
+                    counts = future.result()
+                except Exception as exc:
+                    self.stderr.write(f"Department {dept_id}: worker crashed: {exc}")
+                    totals["failed"] += 1
+                    continue
+                for name, value in counts.items():
+                    totals[name] += value
+                self.stdout.write(
+                    f"Department {dept_id}: {counts['rendered']} rendered, "
+                    f"{counts['cached']} already cached, {counts['failed']} failed"
+                )
+
+        self.stdout.write(
+            f"Pre-rendered {len(dept_ids)} department(s): {totals['rendered']} rendered, "
+            f"{totals['cached']} already cached, {totals['failed']} failed."
+        )
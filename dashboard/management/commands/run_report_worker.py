@@ -0,0 +1,84 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from dashboard.reporting.jobs import (
+    claim_report_jobs,
+    fail_report_jobs,
+    reap_stale_report_jobs,
+    reset_inherited_connections,
+    run_report_job,
+)
+
+
+def _run_job(job_id):
+    try:
+        return run_report_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Process queued report jobs with a local process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "REPORT_JOB_WORKERS", None) or os.cpu_count() or 2,
+            help="Number of worker processes.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=getattr(settings, "REPORT_JOB_POLL_INTERVAL", 2.0),
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        poll_interval = options["poll_interval"]
+        in_flight = {}
+
+        connections.close_all()
+        self.stdout.write(f"Report worker started with {workers} process(es).")
+        with ProcessPoolExecutor(max_workers=workers, initializer=reset_inherited_connections) as pool:
+            try:
+                while True:
+                    reap_stale_report_jobs()
+                    claimed = claim_report_jobs(workers - len(in_flight))
+                    for index, job_id in enumerate(claimed):
+                        try:
+                            in_flight[pool.submit(_run_job, job_id)] = job_id
+                        except Exception as exc:
+                            # The pool is broken; fail what was claimed and
+                            # let the supervisor restart the worker.
+                            fail_report_jobs(claimed[index:], f"Could not start report job: {exc}")
+                            raise CommandError(f"Report worker pool failed: {exc}") from exc
+
+                    if not in_flight:
+                        if options["once"]:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, _pending = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job_id = in_flight.pop(future)
+                        try:
+                            status = future.result()
+                        except Exception as exc:
+                            status = "failed"
+                            fail_report_jobs([job_id], f"Worker process crashed: {exc}")
+                        self.stdout.write(f"Report job {job_id}: {status}")
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping report worker.")
@@ -0,0 +1,183 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import GZipMiddleware
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.regex_helper import _lazy_re_compile
+from django_htmx.http import HttpResponseClientRedirect
+
+from .models import Department
+from .responses import FastJsonResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+COMPRESSIBLE_CONTENT_TYPES = {
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+
+
+class ResponseCompressionMiddleware(GZipMiddleware):
+    """
+    Compress htmx partials, JSON and other text responses above
+    RESPONSE_COMPRESSION_MIN_SIZE bytes. Brotli is preferred when the
+    client accepts it and the ``brotli`` package is installed; everything
+    else falls back to Django's gzip handling. Binary downloads (PDF, xlsx,
+    zip) are already compressed and pass through untouched.
+
+    HTML always goes through gzip. Pages carry the CSRF token next to
+    reflected input, and Django's gzip adds random-length padding against
+    BREACH, which the brotli branch does not.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in COMPRESSIBLE_CONTENT_TYPES:
+            return response
+
+        min_size = getattr(settings, "RESPONSE_COMPRESSION_MIN_SIZE", 1024)
+        if not response.streaming and len(response.content) < min_size:
+            return response
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if (
+            brotli is not None
+            and content_type != "text/html"
+            and not response.streaming
+            and re_accepts_brotli.search(accept_encoding)
+        ):
+            patch_vary_headers(response, ("Accept-Encoding",))
+            compressed_content = brotli.compress(
+                response.content,
+                quality=getattr(settings, "RESPONSE_COMPRESSION_BROTLI_QUALITY", 5),
+            )
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers["Content-Length"] = str(len(response.content))
+            etag = response.get("ETag")
+            if etag and etag.startswith('"'):
+                response.headers["ETag"] = "W/" + etag
+            response.headers["Content-Encoding"] = "br"
+            return response
+
+        return super().process_response(request, response)
+
+
+# =========================
+# SESSION DEPARTMENT
+# =========================
+
+def department_cache_key(dept_id):
+    return f"dashboard:department:{dept_id}"
+
+
+# Loaded into the cached instance. The password hash is left out so it is
+# never copied into a cache; other fields are fetched on access.
+CACHED_DEPARTMENT_FIELDS = ("id", "name", "email", "image")
+
+
+def get_cached_department(dept_id):
+    """
+    The Department for ``dept_id`` from a short-TTL cache, or ``None`` if
+    it does not exist. Only ``CACHED_DEPARTMENT_FIELDS`` are loaded.
+
+    Saves and deletes invalidate the entry (see ``signals``), but only in
+    the process that made them: with a per-process cache, other processes
+    keep their copy until the TTL (``DEPARTMENT_CACHE_TIMEOUT``) expires.
+    ``QuerySet.update()`` invalidates nothing. Serving a renamed or deleted
+    department for up to that long is accepted.
+    """
+    key = department_cache_key(dept_id)
+    dept = cache.get(key)
+    if dept is None:
+        dept = Department.objects.filter(id=dept_id).only(*CACHED_DEPARTMENT_FIELDS).first()
+        if dept is not None:
+            cache.set(key, dept, getattr(settings, "DEPARTMENT_CACHE_TIMEOUT", 60))
+    return dept
+
+
+def invalidate_cached_department(dept_id):
+    cache.delete(department_cache_key(dept_id))
+
+
+def _session_department(request):
+    dept_id = request.session.get("department_id")
+    if not dept_id:
+        return None
+    return get_cached_department(dept_id)
+
+
+def department_login_not_required(view_func):
+    """Let a dashboard view run without a logged-in department (login, logout, staff views)."""
+    view_func.department_login_required = False
+    return view_func
+
+
+def department_json_endpoint(view_func):
+    """Answer unauthenticated calls to this view with a JSON 401 instead of the login redirect."""
+    view_func.department_json_endpoint = True
+    return view_func
+
+
+def _requires_department(view_func):
+    required = getattr(view_func, "department_login_required", None)
+    if required is not None:
+        return required
+    # Admin, static and other third-party views handle their own access.
+    # Admin views overridden in dashboard/admin.py keep that module name
+    # through admin_view(), so they are excluded explicitly.
+    module = getattr(view_func, "__module__", "")
+    return module.startswith("dashboard.") and module != "dashboard.admin"
+
+
+def unauthenticated_response(request, view_func):
+    if getattr(view_func, "department_json_endpoint", False):
+        return FastJsonResponse({"detail": "Unauthorized"}, status=401)
+    if getattr(request, "htmx", False):
+        # A 302 would be followed by htmx and swap the login page into the fragment.
+        return HttpResponseClientRedirect(reverse("login"))
+    return redirect("login")
+
+
+class DepartmentMiddleware:
+    """
+    Attach the logged-in department to ``request.department`` and turn away
+    unauthenticated requests before any dashboard view runs: a redirect to
+    the login page, an ``HX-Redirect`` for htmx requests and a JSON 401 for
+    views marked :func:`department_json_endpoint`.
+
+    ``request.department`` is resolved lazily, at most once per request. It
+    wraps ``None`` when logged out, so test it for truth rather than with
+    ``is None``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.department = SimpleLazyObject(lambda: _session_department(request))
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not _requires_department(view_func) or request.department:
+            return None
+        return unauthenticated_response(request, view_func)
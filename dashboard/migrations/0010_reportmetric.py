@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_change_watermarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(db_index=True, max_length=20)),
+                ('file_format', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField(default=200)),
+                ('department_projects', models.PositiveIntegerField(default=0)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('output_bytes', models.PositiveBigIntegerField(default=0)),
+                ('build_ms', models.FloatField(default=0)),
+                ('render_ms', models.FloatField(default=0)),
+                ('serialize_ms', models.FloatField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('peak_memory_bytes', models.PositiveBigIntegerField(default=0)),
+                ('render_peak_memory_bytes', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_metrics', to='dashboard.department')),
+            ],
+            options={
+                'ordering': ('-created_at', '-id'),
+            },
+        ),
+    ]
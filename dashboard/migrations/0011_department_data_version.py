@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_reportmetric'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='data_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
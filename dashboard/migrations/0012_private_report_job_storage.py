@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:04
+
+import dashboard.storage
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def move_artifacts_to_private_storage(apps, schema_editor):
+    """Move finished report files out of MEDIA_ROOT, where they were publicly served."""
+    ReportJob = apps.get_model("dashboard", "ReportJob")
+    private_storage = dashboard.storage.report_job_storage()
+    for job in ReportJob.objects.exclude(artifact="").iterator():
+        name = job.artifact.name
+        if not default_storage.exists(name):
+            continue
+        with default_storage.open(name, "rb") as source:
+            stored_name = private_storage.save(name, source)
+        default_storage.delete(name)
+        if stored_name != name:
+            ReportJob.objects.filter(pk=job.pk).update(artifact=stored_name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_department_data_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='artifact',
+            field=models.FileField(blank=True, storage=dashboard.storage.report_job_storage, upload_to='reports/'),
+        ),
+        migrations.RunPython(move_artifacts_to_private_storage, migrations.RunPython.noop),
+    ]
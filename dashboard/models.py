@@ -2,6 +2,8 @@ from django.db import models
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
+from .storage import report_job_storage
+
 
 
 class Department(models.Model):
@@ -12,9 +14,24 @@ class Department(models.Model):
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=128)  # will store hashed password
 
+    # Bumped on every department/worker/project/membership change (see
+    # signals); keys cached aggregates and on-disk report artifacts across
+    # processes.
+    data_version = models.PositiveIntegerField(default=1, editable=False)
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # data_version is only changed through bump_department_data_version();
+        # writing back an instance's stale copy would roll it back.
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "data_version"
+            ]
+        super().save(*args, **kwargs)
+
 
 class Worker(models.Model):
 
@@ -41,6 +58,8 @@ class Worker(models.Model):
     department_role = models.CharField(max_length=100)
     working_status = models.CharField(max_length=20, choices=WORKING_STATUS)
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     def __str__(self):
         return f"{self.name} ({self.worker_type})"
     
@@ -78,6 +97,8 @@ class Project(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     github_link = models.URLField(blank=True, null=True)
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     def clean(self):
 
         if self.category != 'company' and not self.amount:
@@ -99,9 +120,88 @@ class ProjectMember(models.Model):
 
     contribution = models.CharField(max_length=10,default='gold', choices=CONTRIBUTION)
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     class Meta:
         unique_together = ('project', 'worker')
 
     def __str__(self):
         return f"{self.worker.name} - {self.project.title}"
 
+
+
+class ReportJob(models.Model):
+
+    REPORT_TYPE = (
+        ('main', 'Main Overall'),
+        ('team', 'Team Overall'),
+        ('worker', 'Worker Detail'),
+    )
+
+    FILE_FORMAT = (
+        ('csv', 'Excel'),
+        ('pdf', 'PDF'),
+    )
+
+    STATUS = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="report_jobs")
+
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE)
+    file_format = models.CharField(max_length=10, choices=FILE_FORMAT)
+    params = models.JSONField(default=dict, blank=True)
+    dedup_key = models.CharField(max_length=64, db_index=True)
+
+    status = models.CharField(max_length=10, choices=STATUS, default='pending', db_index=True)
+    artifact = models.FileField(upload_to="reports/", storage=report_job_storage, blank=True)
+    filename = models.CharField(max_length=200, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('created_at', 'id')
+
+    @property
+    def is_active(self):
+        return self.status in ('pending', 'running')
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} {self.file_format} #{self.pk} ({self.status})"
+
+
+class ReportMetric(models.Model):
+    """One instrumented report generation: phase timings, size and memory."""
+
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name="report_metrics")
+
+    report_type = models.CharField(max_length=20, db_index=True)
+    file_format = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField(default=200)
+
+    department_projects = models.PositiveIntegerField(default=0)
+    row_count = models.PositiveIntegerField(default=0)
+    output_bytes = models.PositiveBigIntegerField(default=0)
+
+    build_ms = models.FloatField(default=0)
+    render_ms = models.FloatField(default=0)
+    serialize_ms = models.FloatField(default=0)
+    total_ms = models.FloatField(default=0)
+
+    peak_memory_bytes = models.PositiveBigIntegerField(default=0)
+    render_peak_memory_bytes = models.PositiveBigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ('-created_at', '-id')
+
+    def __str__(self):
+        return f"{self.report_type} {self.file_format} {self.total_ms:.0f}ms"
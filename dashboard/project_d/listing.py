@@ -1,10 +1,14 @@
 from decimal import Decimal
-from io import BytesIO
-import os
 
-from django.http import HttpResponse, JsonResponse
 
 from ..models import Project
+from ..reporting.metrics import instrumented_report, record_rows, report_phase
+from ..reporting.pdf import HAS_REPORTLAB, data_table, render_pdf, reportlab_missing_response
+from ..reporting.pool import pooled_pdf_response
+from ..reporting.snapshot import department_snapshot
+from ..reporting.streaming import STREAM_CHUNK_SIZE, money, streaming_csv_response
+from ..reporting.xlsx import HAS_OPENPYXL, ReportWorkbook, openpyxl_missing_response
+from .rows import iter_project_rows
 
 
 def _apply_listing_filters(queryset, query_params):
@@ -39,12 +43,88 @@ def _apply_listing_filters(queryset, query_params):
     return queryset
 
 
-def _listing_rows(projects):
+def normalize_listing_params(query_params):
+    """The listing filters that actually change the result, in canonical form."""
+    params = {}
+    q = (query_params.get("q") or "").strip().casefold()
+    if q:
+        params["q"] = q
+    for name in ("month", "year"):
+        value = (query_params.get(name) or "").strip()
+        if value:
+            params[name] = value
+    status_value = (query_params.get("status") or "").strip()
+    if status_value in {choice[0] for choice in Project.PROJECT_STATUS}:
+        params["status"] = status_value
+    return params
+
+
+def _listing_matches(project, params):
+    """In-memory twin of :func:`_apply_listing_filters` over normalized params."""
+    if "q" in params and params["q"] not in project.title.casefold():
+        return False
+    if "month" in params:
+        try:
+            month_year, month_num = params["month"].split("-")
+            if (project.start_date.year, project.start_date.month) != (int(month_year), int(month_num)):
+                return False
+        except (TypeError, ValueError):
+            pass
+    if "year" in params:
+        try:
+            if project.start_date.year != int(params["year"]):
+                return False
+        except (TypeError, ValueError):
+            pass
+    if "status" in params and project.status != params["status"]:
+        return False
+    return True
+
+
+def _iter_listing_table(dept, category_key, query_params):
+    """Yield ``(title, category, start_date, status, amount, assigned_workers)`` for the filtered listing."""
+    queryset = _apply_listing_filters(
+        dept.projects.filter(category=category_key).order_by("-start_date", "-id"),
+        query_params,
+    )
+    for _id, title, start_date, category, status, amount, worker_names in iter_project_rows(queryset, chunk_size=STREAM_CHUNK_SIZE):
+        yield title, category, start_date.strftime("%Y-%m-%d"), status, amount, ", ".join(worker_names) or "No workers assigned"
+
+
+@instrumented_report("listing", "csv")
+def generate_project_listing_excel_report(dept, category_key, query_params):
+    if not HAS_OPENPYXL:
+        return openpyxl_missing_response()
+
+    workbook = ReportWorkbook()
+    sheet = workbook.add_sheet("Project Listing", [34, 18, 14, 14, 12, 48], freeze_panes="A2")
+    sheet.header(
+        [
+            "Project Name",
+            "Project Category",
+            "Start Date",
+            "Status",
+            "Amount",
+            "Assigned Workers",
+        ],
+        style="report_label",
+    )
+    for title, category, start_date, status, amount, assigned_workers in _iter_listing_table(dept, category_key, query_params):
+        sheet.append(
+            [title, category, start_date, status, f"\u20B9{Decimal(amount):,.2f}", assigned_workers],
+            wrap_columns=(6,),
+        )
+
+    return workbook.response(f"{category_key}_project_listing.xlsx")
+
+
+def build_project_listing_report_data(dept, category_key, query_params):
+    snapshot = department_snapshot(dept)
+    params = normalize_listing_params(query_params)
     rows = []
-    for project in projects:
-        worker_names = ", ".join(
-            project.members.all().values_list("worker__name", flat=True)
-        ) or "No workers assigned"
+    for project in snapshot.projects_for(category=category_key):
+        if not _listing_matches(project, params):
+            continue
         rows.append(
             {
                 "project_name": project.title,
@@ -52,195 +132,52 @@ def _listing_rows(projects):
                 "start_date": project.start_date.strftime("%Y-%m-%d"),
                 "status": project.get_status_display(),
                 "amount": project.amount or Decimal("0.00"),
-                "assigned_workers": worker_names,
+                "assigned_workers": ", ".join(snapshot.worker_names(project)) or "No workers assigned",
             }
         )
-    return rows
-
-
-def _filtered_projects_for_report(dept, category_key, query_params):
-    queryset = (
-        dept.projects.filter(category=category_key)
-        .prefetch_related("members__worker")
-        .order_by("-start_date", "-id")
-    )
-    return _apply_listing_filters(queryset, query_params)
-
-
-def generate_project_listing_excel_report(dept, category_key, query_params):
-    try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment
-        has_openpyxl = True
-    except ImportError:
-        has_openpyxl = False
-
-    projects = _filtered_projects_for_report(dept, category_key, query_params)
-    rows = _listing_rows(projects)
-
-    if not has_openpyxl:
-        return JsonResponse(
-            {"detail": "Excel generation dependency missing. Install openpyxl."},
-            status=500,
-        )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Project Listing"
-
-    headers = [
-        "Project Name",
-        "Project Category",
-        "Start Date",
-        "Status",
-        "Amount",
-        "Assigned Workers",
+    return {
+        "category_key": category_key,
+        "rows": rows,
+    }
+
+
+def render_project_listing_pdf(report):
+    rows = [
+        [
+            item["project_name"],
+            item["project_category"],
+            item["start_date"],
+            item["status"],
+            f"\u20B9{Decimal(item['amount']):,.2f}",
+            item["assigned_workers"],
+        ]
+        for item in report["rows"]
     ]
-    widths = [34, 18, 14, 14, 12, 48]
-    for i, width in enumerate(widths, start=1):
-        ws.column_dimensions[chr(64 + i)].width = width
-
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="left", vertical="center")
-
-    row_idx = 2
-    for item in rows:
-        ws.cell(row=row_idx, column=1, value=item["project_name"])
-        ws.cell(row=row_idx, column=2, value=item["project_category"])
-        ws.cell(row=row_idx, column=3, value=item["start_date"])
-        ws.cell(row=row_idx, column=4, value=item["status"])
-        ws.cell(row=row_idx, column=5, value=f"\u20B9{Decimal(item['amount']):,.2f}")
-        ws.cell(row=row_idx, column=6, value=item["assigned_workers"])
-        for col_idx in range(1, 7):
-            ws.cell(row=row_idx, column=col_idx).alignment = Alignment(
-                horizontal="left",
-                vertical="center",
-                wrap_text=(col_idx == 6),
-            )
-        row_idx += 1
-
-    ws.freeze_panes = "A2"
-
-    filename = f"{category_key}_project_listing.xlsx"
-    output = BytesIO()
-    wb.save(output)
-    payload = output.getvalue()
-    output.close()
-
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    response.write(payload)
-    return response
+    story = [
+        *data_table(
+            ["Project Name", "Project Category", "Start Date", "Status", "Amount", "Assigned Workers"],
+            rows,
+            [0.23, 0.17, 0.12, 0.12, 0.10, 0.26],
+            preset="grid",
+        ),
+    ]
+    return render_pdf(story, title=f"{report['category_key'].title()} Project Listing", margin_y=10)
 
 
+@instrumented_report("listing", "pdf")
 def generate_project_listing_pdf_report(dept, category_key, query_params):
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import ParagraphStyle
-        from reportlab.lib.units import mm
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
-        from reportlab.lib.enums import TA_LEFT
-    except ImportError:
-        return HttpResponse(
-            "PDF generation dependency is missing. Install reportlab.",
-            status=500,
-            content_type="text/plain",
-        )
+    if not HAS_REPORTLAB:
+        return reportlab_missing_response()
+    with report_phase("build"):
+        report = build_project_listing_report_data(dept, category_key, query_params)
+    record_rows(len(report["rows"]))
+    return pooled_pdf_response(render_project_listing_pdf, report, f"{category_key}_project_listing.pdf")
 
-    projects = _filtered_projects_for_report(dept, category_key, query_params)
-    rows = _listing_rows(projects)
-
-    font_name = "Helvetica"
-    for path in [
-        "C:/Windows/Fonts/arial.ttf",
-        "C:/Windows/Fonts/calibri.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-    ]:
-        if os.path.exists(path):
-            try:
-                pdfmetrics.registerFont(TTFont("ListingSans", path))
-                font_name = "ListingSans"
-                break
-            except Exception:
-                pass
-
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        leftMargin=10 * mm,
-        rightMargin=10 * mm,
-        topMargin=10 * mm,
-        bottomMargin=10 * mm,
-        title=f"{category_key.title()} Project Listing",
-    )
 
-    table_header_style = ParagraphStyle(
-        "th",
-        fontName=font_name,
-        fontSize=9,
-        textColor=colors.white,
-        alignment=TA_LEFT,
-    )
-    table_cell_style = ParagraphStyle(
-        "td",
-        fontName=font_name,
-        fontSize=8.5,
-        textColor=colors.HexColor("#1f2937"),
-        alignment=TA_LEFT,
-    )
+def stream_project_listing_csv_report(dept, category_key, query_params):
+    def rows():
+        yield ["Project Name", "Project Category", "Start Date", "Status", "Amount", "Assigned Workers"]
+        for title, category, start_date, status, amount, assigned_workers in _iter_listing_table(dept, category_key, query_params):
+            yield [title, category, start_date, status, money(amount), assigned_workers]
 
-    data = [[
-        Paragraph("Project Name", table_header_style),
-        Paragraph("Project Category", table_header_style),
-        Paragraph("Start Date", table_header_style),
-        Paragraph("Status", table_header_style),
-        Paragraph("Amount", table_header_style),
-        Paragraph("Assigned Workers", table_header_style),
-    ]]
-    for item in rows:
-        data.append([
-            Paragraph(item["project_name"], table_cell_style),
-            Paragraph(item["project_category"], table_cell_style),
-            Paragraph(item["start_date"], table_cell_style),
-            Paragraph(item["status"], table_cell_style),
-            Paragraph(f"\u20B9{Decimal(item['amount']):,.2f}", table_cell_style),
-            Paragraph(item["assigned_workers"], table_cell_style),
-        ])
-
-    usable_width = A4[0] - (20 * mm)
-    col_widths = [
-        usable_width * 0.23,
-        usable_width * 0.17,
-        usable_width * 0.12,
-        usable_width * 0.12,
-        usable_width * 0.10,
-        usable_width * 0.26,
-    ]
-    table = Table(data, colWidths=col_widths, repeatRows=1)
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2E5FA3")),
-        ("GRID", (0, 0), (-1, -1), 0.3, colors.HexColor("#d1d5db")),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 5),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-    ]))
-
-    doc.build([table])
-    payload = buffer.getvalue()
-    buffer.close()
-
-    filename = f"{category_key}_project_listing.pdf"
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    response.write(payload)
-    return response
+    return streaming_csv_response(f"{category_key}_project_listing.csv", rows())
@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, Q, Value
+
+from ..models import Project
+
+
+def with_member_summary(queryset):
+    """Annotate each project with its worker names (in membership order) and member count in the main SELECT."""
+    return queryset.annotate(
+        worker_names=ArrayAgg(
+            "members__worker__name",
+            filter=Q(members__isnull=False),
+            order_by="members__id",
+            default=Value([]),
+        ),
+        member_count=Count("members", distinct=True),
+    )
+
+
+def iter_project_rows(queryset, chunk_size=2000):
+    """
+    Yield ``(id, title, start_date, category_label, status_label, amount, worker_names)``
+    for each project over a server-side cursor.
+    """
+    category_lookup = dict(Project.PROJECT_CATEGORY)
+    status_lookup = dict(Project.PROJECT_STATUS)
+    rows = (
+        with_member_summary(queryset)
+        .values_list("id", "title", "start_date", "category", "status", "amount", "worker_names")
+        .iterator(chunk_size=chunk_size)
+    )
+    for project_id, title, start_date, category, status, amount, worker_names in rows:
+        yield (
+            project_id,
+            title,
+            start_date,
+            category_lookup.get(category, category),
+            status_lookup.get(status, status),
+            amount or Decimal("0.00"),
+            [name for name in (worker_names or []) if name],
+        )
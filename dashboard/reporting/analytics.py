@@ -0,0 +1,258 @@
+import tempfile
+import zlib
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ..aggregates import split_project_amount
+from ..models import Project, ProjectMember, Worker
+from ..responses import FastJsonResponse, dumps
+from .streaming import STREAM_CHUNK_SIZE
+from .xlsx import SPOOL_MAX_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+EXPORT_FORMATS = ("ndjson", "parquet")
+
+# Uncompressed NDJSON gathered before each call into the gzip compressor.
+NDJSON_FLUSH_BYTES = 64 * 1024
+
+CENT = Decimal("0.01")
+
+DEFAULT_SAFETY_LAG = 5 * 60
+
+
+def parquet_missing_response():
+    return FastJsonResponse(
+        {"detail": "Parquet export dependency missing. Install pyarrow."},
+        status=500,
+    )
+
+
+def export_safety_lag():
+    return timedelta(seconds=getattr(settings, "ANALYTICS_EXPORT_SAFETY_LAG", DEFAULT_SAFETY_LAG))
+
+
+def parse_since(value):
+    """
+    Parse a ``since=`` watermark (ISO datetime or date) into an aware
+    datetime. Returns ``None`` for an empty value, raises ``ValueError``
+    when it cannot be parsed.
+    """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid since value: {value}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _changed(queryset, since, until, field="updated_at"):
+    if until is not None:
+        queryset = queryset.filter(**{f"{field}__lt": until})
+    if since is not None:
+        queryset = queryset.filter(**{f"{field}__gte": since})
+    return queryset
+
+
+def _iter_projects(dept_id, since, until):
+    return (
+        _changed(Project.objects.filter(department_id=dept_id), since, until)
+        .order_by("id")
+        .values_list("id", "title", "category", "work_type", "start_date", "status", "amount", "github_link", "updated_at")
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+
+
+def _iter_workers(dept_id, since, until):
+    return (
+        _changed(Worker.objects.filter(department_id=dept_id), since, until)
+        .order_by("id")
+        .values_list(
+            "id", "name", "email", "worker_type", "posting", "department_role",
+            "working_status", "date_of_join", "updated_at",
+        )
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+
+
+def _iter_members(dept_id, since, until):
+    return (
+        _changed(ProjectMember.objects.filter(project__department_id=dept_id), since, until)
+        .order_by("id")
+        .values_list("id", "project_id", "worker_id", "contribution", "updated_at")
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+
+
+def _iter_payouts(dept_id, since, until):
+    """
+    Per-member payouts of every changed project. Membership changes touch
+    the project's ``updated_at``, so the project watermark covers them.
+    """
+    rows = (
+        _changed(ProjectMember.objects.filter(project__department_id=dept_id), since, until, "project__updated_at")
+        .order_by("project_id", "id")
+        .values_list("project_id", "id", "worker_id", "contribution", "project__amount", "project__updated_at")
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+    for project_id, members in groupby(rows, key=lambda row: row[0]):
+        members = list(members)
+        amount = members[0][4]
+        updated_at = members[0][5]
+        payments = split_project_amount(amount, [(row[1], row[3]) for row in members])
+        for _project_id, member_id, worker_id, contribution, _amount, _updated in members:
+            payout = payments.get(member_id, Decimal("0.00")).quantize(CENT)
+            yield (project_id, member_id, worker_id, contribution, amount, payout, updated_at)
+
+
+# dataset -> (columns as (name, kind), row iterator)
+DATASETS = {
+    "projects": (
+        [
+            ("id", "int"), ("title", "str"), ("category", "str"), ("work_type", "str"),
+            ("start_date", "date"), ("status", "str"), ("amount", "decimal"),
+            ("github_link", "str"), ("updated_at", "datetime"),
+        ],
+        _iter_projects,
+    ),
+    "workers": (
+        [
+            ("id", "int"), ("name", "str"), ("email", "str"), ("worker_type", "str"),
+            ("posting", "str"), ("department_role", "str"), ("working_status", "str"),
+            ("date_of_join", "date"), ("updated_at", "datetime"),
+        ],
+        _iter_workers,
+    ),
+    "members": (
+        [
+            ("id", "int"), ("project_id", "int"), ("worker_id", "int"),
+            ("contribution", "str"), ("updated_at", "datetime"),
+        ],
+        _iter_members,
+    ),
+    "payouts": (
+        [
+            ("project_id", "int"), ("member_id", "int"), ("worker_id", "int"),
+            ("contribution", "str"), ("project_amount", "decimal"), ("payout", "decimal"),
+            ("project_updated_at", "datetime"),
+        ],
+        _iter_payouts,
+    ),
+}
+
+
+def _ndjson_gzip_chunks(names, rows):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending = []
+    pending_size = 0
+    for row in rows:
+        line = dumps(dict(zip(names, row))) + b"\n"
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= NDJSON_FLUSH_BYTES:
+            compressed = compressor.compress(b"".join(pending))
+            pending = []
+            pending_size = 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b"".join(pending)) + compressor.flush()
+
+
+def _arrow_type(kind):
+    return {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+        "decimal": pa.decimal128(12, 2),
+    }[kind]
+
+
+def _write_parquet_batch(writer, schema, batch):
+    arrays = [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)]
+    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def _parquet_file(columns, rows):
+    """Write ``rows`` to a spooled Parquet file in record batches of ``STREAM_CHUNK_SIZE``."""
+    schema = pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with pq.ParquetWriter(spool, schema, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= STREAM_CHUNK_SIZE:
+                _write_parquet_batch(writer, schema, batch)
+                batch = []
+        if batch:
+            _write_parquet_batch(writer, schema, batch)
+    spool.seek(0)
+    return spool
+
+
+def analytics_export_response(dept, dataset, file_format, since=None):
+    """
+    Export one dataset of rows changed in ``[since, watermark)``. The
+    watermark is fixed when the export starts and returned in the
+    ``X-Export-Watermark`` header; pass it as the next ``since``.
+
+    The watermark trails the clock by ``ANALYTICS_EXPORT_SAFETY_LAG``
+    seconds. ``updated_at`` is set when a row is saved, not when its
+    transaction commits, so a row still being written when the export
+    starts may later appear with an ``updated_at`` before the watermark.
+    The lag must be at least as long as the longest write transaction, or
+    such rows are skipped by every incremental export.
+
+    A full export (no ``since``) is not cut off at the watermark: it
+    returns every row visible when it starts. Its watermark is still
+    lagged, so rows changed in the last ``ANALYTICS_EXPORT_SAFETY_LAG``
+    seconds are exported again by the next incremental run; consumers
+    should upsert rather than append.
+
+    Deleted rows are not reported; run a full export to reconcile them.
+    """
+    if file_format == "parquet" and not HAS_PYARROW:
+        return parquet_missing_response()
+
+    columns, iter_rows = DATASETS[dataset]
+    until = timezone.now() - export_safety_lag()
+    if since is not None and since > until:
+        # Polled again within the lag: export nothing, keep the watermark.
+        until = since
+    rows = iter_rows(dept.id, since, until if since is not None else None)
+
+    if file_format == "parquet":
+        response = FileResponse(
+            _parquet_file(columns, rows),
+            as_attachment=True,
+            filename=f"{dataset}.parquet",
+            content_type="application/vnd.apache.parquet",
+        )
+    else:
+        response = StreamingHttpResponse(
+            _ndjson_gzip_chunks([name for name, _kind in columns], rows),
+            content_type="application/gzip",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{dataset}.ndjson.gz"'
+
+    response["X-Export-Watermark"] = until.isoformat()
+    if since is not None:
+        response["X-Export-Since"] = since.isoformat()
+    return response
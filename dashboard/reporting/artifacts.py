@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from ..aggregates import department_data_version
+from ..singleflight import single_flight
+from .downloads import file_download_response
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def artifact_root():
+    return Path(getattr(settings, "REPORT_ARTIFACT_DIR", Path(settings.BASE_DIR) / "report_cache"))
+
+
+def artifact_key(dept_id, report_type, file_format, params=None, version=None):
+    """
+    Content address for a rendered report: the department data version,
+    report type, format and normalized params. Any data change bumps the
+    version, so stale files are never served; they simply age out.
+    """
+    if version is None:
+        version = department_data_version(dept_id)
+    payload = json.dumps(
+        {
+            "dept": dept_id,
+            "version": version,
+            "report": report_type,
+            "format": file_format,
+            "params": params or {},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def response_payload(response):
+    """Read the full body of a regular or streaming response and close it."""
+    if response.streaming:
+        payload = b"".join(response.streaming_content)
+    else:
+        payload = response.content
+    response.close()
+    return payload
+
+
+def response_filename(response, default):
+    match = re.search(r'filename="([^"]+)"', response.get("Content-Disposition", ""))
+    return match.group(1) if match else default
+
+
+def _artifact_dir(key):
+    return artifact_root() / key[:2] / key
+
+
+def lookup_artifact(key):
+    """Return the cached file path for ``key`` (marking it recently used) or ``None``."""
+    directory = _artifact_dir(key)
+    try:
+        names = [name for name in os.listdir(directory) if not name.startswith(".")]
+    except FileNotFoundError:
+        return None
+    if not names:
+        return None
+    path = directory / names[0]
+    try:
+        # Only the access time marks use; the modification time stays the
+        # write time because the download ETag is built from it.
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store_artifact(key, filename, payload):
+    """Atomically write ``payload`` under ``key`` and evict old files past the size limit."""
+    directory = _artifact_dir(key)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / filename
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    evict_artifacts()
+    return path
+
+
+def evict_artifacts(max_bytes=None):
+    """Delete least recently used artifacts until the cache fits in ``max_bytes``."""
+    if max_bytes is None:
+        max_bytes = getattr(settings, "REPORT_ARTIFACT_MAX_BYTES", DEFAULT_MAX_BYTES)
+    root = artifact_root()
+    if not root.exists():
+        return 0
+
+    entries = []
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            if name.startswith("."):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+    removed = 0
+    if total <= max_bytes:
+        return removed
+    entries.sort()
+    for _atime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def _artifact_response(request, key, path):
+    handle = open(path, "rb")
+    stat = os.fstat(handle.fileno())
+    # A re-rendered artifact (after eviction) may differ byte-wise (PDF
+    # timestamps), so the ETag also carries its mtime and size. The inode is
+    # not used: it can be reused for a new file and differs between hosts.
+    etag = f"{key}-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    return file_download_response(request, handle, stat.st_size, path.name, etag)
+
+
+def cached_report_response(request, dept, report_type, file_format, params, build):
+    """
+    Serve a report from the artifact cache, rendering it with ``build()``
+    on a miss. Concurrent misses for the same artifact render it once; the
+    other requests wait and serve the stored file. Error responses from
+    ``build`` are returned uncached.
+
+    Stored files are served with ``ETag`` and byte ``Range`` support, so an
+    interrupted download resumes from the cached file.
+    """
+    key = artifact_key(dept.id, report_type, file_format, params)
+
+    def render():
+        response = build()
+        if response.status_code != 200:
+            return response
+        extension = "pdf" if file_format == "pdf" else "xlsx"
+        filename = response_filename(response, f"{report_type}_report.{extension}")
+        return store_artifact(key, filename, response_payload(response))
+
+    result = single_flight(f"report:{key}", lambda: lookup_artifact(key), render)
+    if not isinstance(result, Path):
+        return result
+    try:
+        return _artifact_response(request, key, result)
+    except FileNotFoundError:
+        # Evicted between the lookup and the open; render it again.
+        result = render()
+        return result if not isinstance(result, Path) else _artifact_response(request, key, result)
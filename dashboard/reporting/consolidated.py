@@ -0,0 +1,198 @@
+import re
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from ..models import Department, Project
+from .snapshot import DepartmentSnapshot
+from .xlsx import HAS_OPENPYXL, ReportWorkbook, openpyxl_missing_response
+
+
+DEFAULT_GATHER_WORKERS = 4
+
+# Excel sheet names: at most 31 characters, none of []:*?/\
+SHEET_TITLE_MAX = 31
+re_sheet_title_invalid = re.compile(r"[\[\]:*?/\\]")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def gather_workers():
+    return getattr(settings, "REPORT_GATHER_WORKERS", DEFAULT_GATHER_WORKERS)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=gather_workers(), thread_name_prefix="report-gather")
+        return _executor
+
+
+def build_department_figures(dept):
+    """Totals, category and status breakdowns and per-worker income for one department."""
+    snapshot = DepartmentSnapshot(dept)
+    projects = snapshot.projects
+    income = snapshot.worker_income()
+
+    category_counts = Counter(project.category for project in projects)
+    category_revenue = defaultdict(lambda: Decimal("0.00"))
+    for project in projects:
+        if project.amount is not None:
+            category_revenue[project.category] += Decimal(project.amount)
+    status_counts = Counter(project.status for project in projects)
+
+    worker_rows = [
+        {
+            "name": worker.name,
+            "email": worker.email or "-",
+            "posting": worker.posting,
+            "project_count": len(snapshot.worker_projects(worker.id)),
+            "income": income.get(worker.id, Decimal("0.00")),
+        }
+        for worker in snapshot.workers
+    ]
+    worker_rows.sort(key=lambda row: row["income"], reverse=True)
+
+    return {
+        "department_name": dept.name,
+        "department_email": dept.email,
+        "worker_count": len(snapshot.workers),
+        "project_count": len(projects),
+        "revenue": snapshot.total_amount(projects),
+        "category_rows": [
+            {"category": label, "project_count": category_counts[key], "revenue": category_revenue[key]}
+            for key, label in Project.PROJECT_CATEGORY
+        ],
+        "status_counts": {key: status_counts[key] for key, _label in Project.PROJECT_STATUS},
+        "worker_rows": worker_rows,
+    }
+
+
+def _gather_department(dept_id):
+    """
+    Runs on a gather thread. Django opens a connection per thread and no
+    request cycle closes it here, so the task closes its own when done.
+    """
+    try:
+        return build_department_figures(Department.objects.get(pk=dept_id))
+    finally:
+        connection.close()
+
+
+def gather_department_figures(dept_ids):
+    """:func:`build_department_figures` for each department, in parallel, in input order."""
+    return list(_get_executor().map(_gather_department, dept_ids))
+
+
+def _sheet_title(name, used):
+    base = re_sheet_title_invalid.sub(" ", name).strip() or "Department"
+    title = base[:SHEET_TITLE_MAX]
+    suffix = 2
+    while title.lower() in used:
+        tail = f" ({suffix})"
+        title = base[:SHEET_TITLE_MAX - len(tail)] + tail
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+
+def _write_summary_sheet(workbook, departments, generated_at):
+    status_labels = [label for _key, label in Project.PROJECT_STATUS]
+    sheet = workbook.add_sheet("Summary", [6, 30, 12, 12, *[12] * len(status_labels), 18], freeze_panes="A6")
+    sheet.append(["Consolidated Department Report"], style="report_label")
+    sheet.append(["Departments", str(len(departments))], styles=["report_label", "report_value"])
+    sheet.append(["Generated At", generated_at], styles=["report_label", "report_value"])
+    sheet.blank()
+    sheet.header(["#", "Department", "Workers", "Projects", *status_labels, "Revenue"])
+
+    totals = {"workers": 0, "projects": 0, "revenue": Decimal("0.00"), "statuses": Counter()}
+    for index, figures in enumerate(departments, start=1):
+        statuses = [figures["status_counts"][key] for key, _label in Project.PROJECT_STATUS]
+        sheet.append(
+            [index, figures["department_name"], figures["worker_count"], figures["project_count"], *statuses, f"Rs {figures['revenue']:,.2f}"],
+            wrap_columns=(2,),
+        )
+        totals["workers"] += figures["worker_count"]
+        totals["projects"] += figures["project_count"]
+        totals["revenue"] += figures["revenue"]
+        totals["statuses"].update(figures["status_counts"])
+    sheet.append(
+        [
+            "",
+            "All Departments",
+            totals["workers"],
+            totals["projects"],
+            *[totals["statuses"][key] for key, _label in Project.PROJECT_STATUS],
+            f"Rs {totals['revenue']:,.2f}",
+        ],
+        style="report_label",
+    )
+
+    sheet.blank()
+    sheet.append_title("Revenue By Category")
+    sheet.header(["#", "Category", "Projects", "Revenue"], style="report_label")
+    for index, (key, label) in enumerate(Project.PROJECT_CATEGORY, start=1):
+        rows = [row for figures in departments for row in figures["category_rows"] if row["category"] == label]
+        sheet.append(
+            [index, label, sum(row["project_count"] for row in rows), f"Rs {sum((row['revenue'] for row in rows), Decimal('0.00')):,.2f}"]
+        )
+
+
+def _write_department_sheet(workbook, figures, title):
+    sheet = workbook.add_sheet(title, [6, 30, 34, 22, 12, 18])
+    summary_rows = [
+        ("Department Name", figures["department_name"]),
+        ("Email", figures["department_email"]),
+        ("Workers", str(figures["worker_count"])),
+        ("Projects", str(figures["project_count"])),
+        ("Revenue", f"Rs {figures['revenue']:,.2f}"),
+    ]
+    for label, value in summary_rows:
+        sheet.append_merged(label, value, 6)
+
+    sheet.blank()
+    sheet.append_title("Table 1: Projects By Category", 6)
+    sheet.header(["#", "Category", "Projects", "Revenue"], style="report_label")
+    for index, row in enumerate(figures["category_rows"], start=1):
+        sheet.append([index, row["category"], row["project_count"], f"Rs {row['revenue']:,.2f}"])
+
+    sheet.blank()
+    sheet.append_title("Table 2: Projects By Status", 6)
+    sheet.header(["#", "Status", "Projects"], style="report_label")
+    for index, (key, label) in enumerate(Project.PROJECT_STATUS, start=1):
+        sheet.append([index, label, figures["status_counts"][key]])
+
+    sheet.blank()
+    sheet.append_title("Table 3: Worker Income", 6)
+    sheet.header(["#", "Name", "Email", "Posting", "Projects", "Income"], style="report_label")
+    for index, row in enumerate(figures["worker_rows"], start=1):
+        sheet.append(
+            [index, row["name"], row["email"], row["posting"], row["project_count"], f"Rs {row['income']:,.2f}"],
+            wrap_columns=(2, 3, 4),
+        )
+
+
+def generate_consolidated_report():
+    """
+    One workbook across every department: a summary sheet, then a sheet per
+    department. Departments are read in parallel on the gather pool.
+    """
+    if not HAS_OPENPYXL:
+        return openpyxl_missing_response()
+
+    dept_ids = list(Department.objects.order_by("name", "id").values_list("id", flat=True))
+    departments = gather_department_figures(dept_ids)
+
+    workbook = ReportWorkbook()
+    _write_summary_sheet(workbook, departments, timezone.localtime().strftime("%Y-%m-%d %H:%M:%S"))
+    used_titles = {"summary"}
+    for figures in departments:
+        _write_department_sheet(workbook, figures, _sheet_title(figures["department_name"], used_titles))
+    return workbook.response("consolidated_department_report.xlsx")
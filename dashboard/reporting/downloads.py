@@ -0,0 +1,121 @@
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+
+re_byte_range = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class _FileRange:
+    """Read-only view of the next ``length`` bytes of ``handle``."""
+
+    def __init__(self, handle, length):
+        self.handle = handle
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def parse_byte_range(header, size):
+    """
+    Parse a ``Range`` header into an inclusive ``(start, end)`` pair.
+
+    Returns ``None`` when the header should be ignored and the whole file
+    sent: no header, an unknown unit, a malformed value or several ranges.
+    Raises :class:`RangeNotSatisfiable` when the range lies past the end
+    of the file.
+    """
+    if not header:
+        return None
+    match = re_byte_range.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the final ``last`` bytes.
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - suffix), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header, etag, weak=False):
+    etags = parse_etags(header)
+    if "*" in etags:
+        return True
+    if weak:
+        return any(tag.removeprefix("W/") == etag for tag in etags)
+    return etag in etags
+
+
+def file_download_response(request, handle, size, filename, etag):
+    """
+    Send an open, seekable binary ``handle`` of ``size`` bytes as an
+    attachment, honouring ``If-None-Match``, ``Range`` and ``If-Range`` so
+    interrupted downloads can resume.
+
+    ``etag`` must change whenever the content does. A single byte range is
+    answered with ``206 Partial Content``; multiple ranges are not
+    supported and get the whole file.
+    """
+    etag = quote_etag(etag)
+
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag, weak=True):
+        handle.close()
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    # Resume only from the same file; a date or stale ETag gets the full body.
+    if if_range is None or _etag_matches(if_range, etag):
+        try:
+            byte_range = parse_byte_range(request.headers.get("Range"), size)
+        except RangeNotSatisfiable:
+            handle.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            response["Accept-Ranges"] = "bytes"
+            response["ETag"] = etag
+            return response
+
+    if byte_range is None:
+        response = FileResponse(handle, as_attachment=True, filename=filename)
+        response["Content-Length"] = str(size)
+    else:
+        start, end = byte_range
+        handle.seek(start)
+        response = FileResponse(_FileRange(handle, end - start + 1), as_attachment=True, filename=filename, status=206)
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
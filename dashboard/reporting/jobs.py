@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..main_d.overall import generate_main_csv_report, generate_main_pdf_report
+from ..models import ReportJob
+from ..team_d.overall import generate_team_csv_report, generate_team_pdf_report
+from ..team_d.worker import generate_worker_csv_report, generate_worker_pdf_report
+from .artifacts import response_filename, response_payload
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STALE_AFTER = 30 * 60
+
+
+def _main_report(dept, params, file_format):
+    if file_format == "pdf":
+        return generate_main_pdf_report(dept)
+    return generate_main_csv_report(dept)
+
+
+def _team_report(dept, params, file_format):
+    if file_format == "pdf":
+        return generate_team_pdf_report(dept)
+    return generate_team_csv_report(dept)
+
+
+def _worker_report(dept, params, file_format):
+    worker = dept.workers.get(id=params["worker_id"])
+    if file_format == "pdf":
+        return generate_worker_pdf_report(dept, worker)
+    return generate_worker_csv_report(dept, worker)
+
+
+REPORT_GENERATORS = {
+    "main": _main_report,
+    "team": _team_report,
+    "worker": _worker_report,
+}
+
+
+def reset_inherited_connections():
+    """
+    Process pool initializer: forked children inherit the parent's database
+    sockets. Drop them without closing so the parent's session is left intact.
+    """
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+
+
+def job_dedup_key(dept_id, report_type, file_format, params):
+    payload = json.dumps([dept_id, report_type, file_format, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stale_cutoff():
+    """Jobs that started running before this are assumed lost."""
+    stale_after = getattr(settings, "REPORT_JOB_STALE_AFTER", DEFAULT_STALE_AFTER)
+    return timezone.now() - timedelta(seconds=stale_after)
+
+
+def active_jobs_filter():
+    """Pending jobs and running jobs that are not stale yet."""
+    return Q(status="pending") | Q(status="running", started_at__gte=stale_cutoff())
+
+
+def enqueue_report_job(dept, report_type, file_format, params=None):
+    """
+    Queue a report for the background worker and return the job.
+
+    A pending or running job for the same department, report, format and
+    params is returned instead of queueing a duplicate. Stale running jobs
+    do not count, so a lost job never blocks the report.
+    """
+    params = params or {}
+    dedup_key = job_dedup_key(dept.id, report_type, file_format, params)
+    with transaction.atomic():
+        existing = (
+            ReportJob.objects.select_for_update()
+            .filter(active_jobs_filter(), dedup_key=dedup_key)
+            .first()
+        )
+        if existing:
+            return existing
+        return ReportJob.objects.create(
+            department=dept,
+            report_type=report_type,
+            file_format=file_format,
+            params=params,
+            dedup_key=dedup_key,
+        )
+
+
+def claim_report_jobs(limit):
+    """Mark up to ``limit`` pending jobs as running and return their ids."""
+    if limit <= 0:
+        return []
+    with transaction.atomic():
+        job_ids = list(
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if job_ids:
+            ReportJob.objects.filter(id__in=job_ids).update(status="running", started_at=timezone.now())
+    return job_ids
+
+
+def fail_report_jobs(job_ids, error):
+    """Mark the given jobs failed if they are still pending or running."""
+    return ReportJob.objects.filter(id__in=job_ids, status__in=("pending", "running")).update(
+        status="failed",
+        error=error,
+        finished_at=timezone.now(),
+    )
+
+
+def reap_stale_report_jobs():
+    """
+    Mark running jobs older than ``REPORT_JOB_STALE_AFTER`` failed.
+
+    Their worker was killed or restarted without recording a result. They
+    are failed rather than requeued so a report that takes a worker down
+    is not retried forever. Returns the number of jobs reaped.
+    """
+    reaped = ReportJob.objects.filter(status="running", started_at__lt=stale_cutoff()).update(
+        status="failed",
+        error="Report job timed out or its worker stopped.",
+        finished_at=timezone.now(),
+    )
+    if reaped:
+        logger.warning("Marked %s stale report job(s) failed", reaped)
+    return reaped
+
+
+def run_report_job(job_id):
+    """Render one claimed job and store its artifact. Runs inside a worker process."""
+    job = ReportJob.objects.select_related("department").get(id=job_id)
+    try:
+        generator = REPORT_GENERATORS[job.report_type]
+        response = generator(job.department, job.params, job.file_format)
+        if response.status_code != 200:
+            raise RuntimeError(f"Report generator returned HTTP {response.status_code}")
+        extension = "pdf" if job.file_format == "pdf" else "xlsx"
+        filename = response_filename(response, f"{job.report_type}_report_{job.pk}.{extension}")
+        job.artifact.save(f"{job.pk}_{filename}", ContentFile(response_payload(response)), save=False)
+        job.filename = filename
+        job.status = "done"
+        job.error = ""
+    except Exception as exc:
+        logger.exception("Report job %s failed", job_id)
+        job.status = "failed"
+        job.error = str(exc) or exc.__class__.__name__
+    job.finished_at = timezone.now()
+    job.save(update_fields=["artifact", "filename", "status", "error", "finished_at"])
+    return job.status
@@ -0,0 +1,257 @@
+import logging
+import math
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+from ..responses import dumps
+
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("build", "render", "serialize")
+
+# Upper bounds (exclusive) of the department size buckets, by project count.
+SIZE_BUCKETS = ((100, "< 100 projects"), (1000, "100-999 projects"), (10000, "1,000-9,999 projects"))
+LARGEST_SIZE_BUCKET = "10,000+ projects"
+
+_current_trace = ContextVar("report_trace", default=None)
+
+# tracemalloc is process-wide: it is started by the first traced report
+# and stopped by the last. Its peak can only be attributed to a report that
+# was traced alone; reports that overlap another one record a peak of 0.
+_tracing_lock = threading.Lock()
+_active_traces = set()
+
+
+def metrics_enabled():
+    return getattr(settings, "REPORT_METRICS_ENABLED", True)
+
+
+def trace_memory_enabled():
+    return getattr(settings, "REPORT_METRICS_TRACEMALLOC", False)
+
+
+def size_bucket(project_count):
+    for upper, label in SIZE_BUCKETS:
+        if project_count < upper:
+            return label
+    return LARGEST_SIZE_BUCKET
+
+
+def _start_memory_trace(trace):
+    with _tracing_lock:
+        if _active_traces:
+            trace.memory_exclusive = False
+            for other in _active_traces:
+                other.memory_exclusive = False
+        else:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            trace.memory_exclusive = True
+        _active_traces.add(trace)
+
+
+def _stop_memory_trace(trace):
+    with _tracing_lock:
+        peak = 0
+        if trace.memory_exclusive and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+        _active_traces.discard(trace)
+        if not _active_traces:
+            tracemalloc.stop()
+    return peak
+
+
+class ReportTrace:
+    def __init__(self, dept, report_type, file_format):
+        self.dept = dept
+        self.report_type = report_type
+        self.file_format = file_format
+        self.phases = defaultdict(float)
+        self.rows = 0
+        self.render_peak = 0
+        self.memory_exclusive = False
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - started
+
+    def record(self, response, total_seconds, peak):
+        """Write the trace to the structured log and the metrics table."""
+        # Imported here: the render pool imports this module (through
+        # pool.py) before its spawned children have loaded the app registry.
+        from ..models import ReportMetric
+        from .snapshot import cached_snapshot
+
+        snapshot = cached_snapshot(self.dept)
+        if snapshot is not None:
+            department_projects = len(snapshot.projects)
+        else:
+            department_projects = self.dept.projects.count()
+
+        output_bytes = int(response.get("Content-Length") or 0)
+        if not output_bytes and not response.streaming:
+            output_bytes = len(response.content)
+
+        timings = {name: round(self.phases.get(name, 0.0) * 1000, 2) for name in PHASES}
+        if "render" not in self.phases:
+            # Excel reports write rows while reading them; whatever is not
+            # build or serialize time is counted as render.
+            timings["render"] = round(max(0.0, total_seconds - self.phases["build"] - self.phases["serialize"]) * 1000, 2)
+
+        entry = {
+            "event": "report_generated",
+            "department_id": self.dept.id,
+            "report_type": self.report_type,
+            "file_format": self.file_format,
+            "status_code": response.status_code,
+            "department_projects": department_projects,
+            "rows": self.rows,
+            "output_bytes": output_bytes,
+            "build_ms": timings["build"],
+            "render_ms": timings["render"],
+            "serialize_ms": timings["serialize"],
+            "total_ms": round(total_seconds * 1000, 2),
+            "peak_memory_bytes": peak,
+            "render_peak_memory_bytes": self.render_peak,
+        }
+        logger.info(dumps(entry).decode("utf-8"))
+        ReportMetric.objects.create(
+            department_id=self.dept.id,
+            report_type=self.report_type,
+            file_format=self.file_format,
+            status_code=response.status_code,
+            department_projects=department_projects,
+            row_count=self.rows,
+            output_bytes=output_bytes,
+            build_ms=timings["build"],
+            render_ms=timings["render"],
+            serialize_ms=timings["serialize"],
+            total_ms=entry["total_ms"],
+            peak_memory_bytes=peak,
+            render_peak_memory_bytes=self.render_peak,
+        )
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def report_phase(name):
+    """Time a phase of the report being generated; a no-op outside a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.phase(name):
+        yield
+
+
+def record_rows(count):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.rows += count
+
+
+def record_render_peak(peak):
+    """Peak traced memory of a render that ran in another process."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.render_peak = max(trace.render_peak, peak)
+
+
+def instrumented_report(report_type, file_format):
+    """
+    Decorate a ``generate_*_report(dept, ...)`` function so each call records
+    phase timings, row count, output size and tracemalloc peak. Phases are
+    marked inside with :func:`report_phase`; the shared render and
+    serialize helpers already do so.
+
+    Only reports that are fully built before the function returns can be
+    measured this way. Streaming responses (the ``stream_*`` CSV exports,
+    the worker ZIP and the report pack) do their work while the response
+    is sent, and the consolidated report spans departments, so they are
+    not instrumented.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(dept, *args, **kwargs):
+            if not metrics_enabled() or _current_trace.get() is not None:
+                return func(dept, *args, **kwargs)
+
+            trace = ReportTrace(dept, report_type, file_format)
+            token = _current_trace.set(trace)
+            trace_memory = trace_memory_enabled()
+            if trace_memory:
+                _start_memory_trace(trace)
+            started = time.perf_counter()
+            try:
+                response = func(dept, *args, **kwargs)
+            finally:
+                total_seconds = time.perf_counter() - started
+                peak = _stop_memory_trace(trace) if trace_memory else 0
+                _current_trace.reset(token)
+
+            try:
+                trace.record(response, total_seconds, peak)
+            except Exception:
+                logger.exception("Could not record report metrics for %s %s", report_type, file_format)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[rank - 1]
+
+
+def summarize_metrics(queryset):
+    """
+    p50/p95 of total time and p95 peak memory per report type, format and
+    department size bucket. Peaks of 0 (memory not traced, or the report
+    overlapped another one) are left out of the memory percentile.
+    """
+    groups = defaultdict(lambda: {"total_ms": [], "peak": []})
+    rows = queryset.values_list("report_type", "file_format", "department_projects", "total_ms", "peak_memory_bytes", "render_peak_memory_bytes")
+    for report_type, file_format, projects, total_ms, peak, render_peak in rows.iterator():
+        group = groups[(report_type, file_format, size_bucket(projects))]
+        group["total_ms"].append(total_ms)
+        if peak or render_peak:
+            group["peak"].append(max(peak, render_peak))
+
+    summary = []
+    for (report_type, file_format, bucket), values in groups.items():
+        total_ms = sorted(values["total_ms"])
+        peaks = sorted(values["peak"])
+        summary.append(
+            {
+                "report_type": report_type,
+                "file_format": file_format,
+                "size_bucket": bucket,
+                "count": len(total_ms),
+                "p50_ms": percentile(total_ms, 0.50),
+                "p95_ms": percentile(total_ms, 0.95),
+                "p95_peak_mib": percentile(peaks, 0.95) / (1024 * 1024) if peaks else None,
+            }
+        )
+    bucket_order = {label: index for index, (_upper, label) in enumerate(SIZE_BUCKETS)}
+    summary.sort(key=lambda row: (row["report_type"], row["file_format"], bucket_order.get(row["size_bucket"], len(SIZE_BUCKETS))))
+    return summary
@@ -0,0 +1,56 @@
+from django.utils.text import slugify
+
+from ..main_d.overall import build_main_report_data, render_main_pdf
+from ..models import Project
+from ..project_d.overall import build_category_report_data, render_category_pdf
+from ..team_d.overall import build_team_report_data, render_team_pdf
+from .pdf import HAS_REPORTLAB, reportlab_missing_response
+from .pool import render_each_in_pool
+from .streaming import streaming_zip_response
+
+
+PACK_RENDERERS = {
+    "main": render_main_pdf,
+    "team": render_team_pdf,
+    "category": render_category_pdf,
+}
+
+
+def render_pack_entry(entry):
+    """Render one ``(kind, report)`` pack entry; module level so the render pool can pickle it."""
+    kind, report = entry
+    return PACK_RENDERERS[kind](report)
+
+
+def build_report_pack_entries(dept):
+    """
+    ``(filename, (kind, report))`` for the main, team and every category
+    report. All of them slice the same department snapshot, so the whole
+    pack costs one database pass.
+    """
+    entries = [
+        ("main_overall_report.pdf", ("main", build_main_report_data(dept))),
+        ("team_overall_report.pdf", ("team", build_team_report_data(dept))),
+    ]
+    for category_key, _label in Project.PROJECT_CATEGORY:
+        entries.append((f"{category_key}_projects_report.pdf", ("category", build_category_report_data(dept, category_key))))
+    return entries
+
+
+def generate_department_report_pack(dept):
+    """Stream the main, team and category PDFs in one ZIP, rendered in parallel."""
+    if not HAS_REPORTLAB:
+        return reportlab_missing_response()
+
+    pack = build_report_pack_entries(dept)
+
+    def files():
+        filenames = (filename for filename, _entry in pack)
+        rendered = render_each_in_pool(render_pack_entry, (entry for _filename, entry in pack))
+        for filename, (_entry, payload) in zip(filenames, rendered):
+            if payload is None:
+                yield f"{filename[:-4]}.error.txt", b"This report could not be rendered. Download it individually.\n"
+            else:
+                yield filename, payload
+
+    return streaming_zip_response(f"{slugify(dept.name) or 'department'}_reports.zip", files())
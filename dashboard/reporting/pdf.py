@@ -0,0 +1,378 @@
+import os
+from functools import lru_cache
+from io import BytesIO
+
+from django.http import HttpResponse
+
+from .metrics import report_phase
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import HRFlowable, LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+
+FONT_CANDIDATES = (
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/calibri.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+)
+
+if HAS_REPORTLAB:
+    BRAND_DARK = colors.HexColor("#1A2B4A")
+    BRAND_MID = colors.HexColor("#2E5FA3")
+    BRAND_LIGHT = colors.HexColor("#E8F0FB")
+    ACCENT = colors.HexColor("#F0A500")
+    WHITE = colors.white
+    GREY_TEXT = colors.HexColor("#4A4A4A")
+    ROW_ALT = colors.HexColor("#EEF3FB")
+    RULE = colors.HexColor("#D0DCF0")
+    CARD_RULE = colors.HexColor("#B0C4E8")
+    FOOTER_RULE = colors.HexColor("#DDDDDD")
+    FOOTER_TEXT = colors.HexColor("#888888")
+    PAGE_FOOTER_TEXT = colors.HexColor("#AAAAAA")
+    GRID_LINE = colors.HexColor("#d1d5db")
+    GRID_TEXT = colors.HexColor("#1f2937")
+
+    PAGE_WIDTH = A4[0] - 20 * mm
+
+# Table density presets: cell font size / leading and paddings.
+TABLE_PRESETS = {
+    "regular": {"header_size": 9, "cell_size": 9, "bold_size": 8.5, "leading": 12, "header_pad": 9, "side_pad": 8, "row_pad": 7},
+    "compact": {"header_size": 9, "cell_size": 8.8, "bold_size": 8.8, "leading": 11, "header_pad": 8, "side_pad": 6, "row_pad": 6},
+    "grid": {"header_size": 9, "cell_size": 8.5, "bold_size": 8.5, "leading": 10.2, "header_pad": 5, "side_pad": 6, "row_pad": 5},
+}
+
+# Rows per table chunk in long listings; even so zebra striping lines up.
+TABLE_CHUNK_ROWS = 200
+
+
+def reportlab_missing_response():
+    return HttpResponse(
+        "PDF generation dependency is missing. Install reportlab.",
+        status=500,
+        content_type="text/plain",
+    )
+
+
+@lru_cache(maxsize=None)
+def report_fonts():
+    """
+    Register the Unicode report font (so ₹ renders) once per process and
+    return ``(font_name, bold_font_name)``.
+    """
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            try:
+                pdfmetrics.registerFont(TTFont("ReportSans", path))
+                return "ReportSans", "ReportSans"
+            except Exception:
+                pass
+    return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=None)
+def report_styles():
+    font_name, bold_font_name = report_fonts()
+    return {
+        "title": ParagraphStyle(
+            "ReportTitle",
+            fontName=bold_font_name, fontSize=22,
+            textColor=WHITE, alignment=TA_LEFT,
+            spaceAfter=0, spaceBefore=0, leading=24,
+        ),
+        "section": ParagraphStyle(
+            "SectionHeading",
+            fontName=bold_font_name, fontSize=11,
+            textColor=BRAND_DARK, spaceBefore=14, spaceAfter=4,
+        ),
+        "label": ParagraphStyle(
+            "Label",
+            fontName=bold_font_name, fontSize=9,
+            textColor=BRAND_DARK,
+        ),
+        "footer": ParagraphStyle(
+            "Footer",
+            fontName=font_name, fontSize=8,
+            textColor=FOOTER_TEXT, alignment=TA_CENTER,
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def subtitle_style(font_size=16):
+    return ParagraphStyle(
+        f"ReportSubtitle{font_size}",
+        fontName=report_fonts()[1], fontSize=font_size,
+        textColor=ACCENT, alignment=TA_RIGHT,
+        spaceAfter=0, spaceBefore=0, leading=18,
+    )
+
+
+@lru_cache(maxsize=None)
+def card_value_style(font_size=16):
+    return ParagraphStyle(
+        f"CardVal{font_size}",
+        fontName=report_fonts()[1], fontSize=font_size,
+        textColor=BRAND_MID, spaceAfter=0,
+    )
+
+
+@lru_cache(maxsize=None)
+def table_cell_styles(preset="regular"):
+    """``(header, cell, cell_bold)`` paragraph styles for a table preset."""
+    font_name, bold_font_name = report_fonts()
+    spec = TABLE_PRESETS[preset]
+    if preset == "grid":
+        return (
+            ParagraphStyle("GridHeader", fontName=font_name, fontSize=spec["header_size"], textColor=WHITE, alignment=TA_LEFT),
+            ParagraphStyle("GridCell", fontName=font_name, fontSize=spec["cell_size"], textColor=GRID_TEXT, alignment=TA_LEFT),
+            ParagraphStyle("GridCellBold", fontName=font_name, fontSize=spec["bold_size"], textColor=GRID_TEXT, alignment=TA_LEFT),
+        )
+    return (
+        ParagraphStyle(f"TableHeader-{preset}", fontName=bold_font_name, fontSize=spec["header_size"], textColor=WHITE, alignment=TA_LEFT),
+        ParagraphStyle(f"TableCell-{preset}", fontName=bold_font_name, fontSize=spec["cell_size"], textColor=GREY_TEXT, leading=spec["leading"]),
+        ParagraphStyle(f"TableCellBold-{preset}", fontName=bold_font_name, fontSize=spec["bold_size"], textColor=BRAND_DARK, leading=spec["leading"]),
+    )
+
+
+def _plain_cell_commands(preset):
+    """Font commands so plain-string body cells match the preset's cell style."""
+    _header, cell_style, _bold = table_cell_styles(preset)
+    return [
+        ("FONT", (0, 1), (-1, -1), cell_style.fontName, cell_style.fontSize, cell_style.leading),
+        ("TEXTCOLOR", (0, 1), (-1, -1), cell_style.textColor),
+    ]
+
+
+@lru_cache(maxsize=None)
+def data_table_style(preset="regular"):
+    """Shared TableStyle for data tables; zebra striping uses ``ROWBACKGROUNDS``."""
+    spec = TABLE_PRESETS[preset]
+    if preset == "grid":
+        return TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), BRAND_MID),
+            ("GRID", (0, 0), (-1, -1), 0.3, GRID_LINE),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), spec["side_pad"]),
+            ("RIGHTPADDING", (0, 0), (-1, -1), spec["side_pad"]),
+            ("TOPPADDING", (0, 0), (-1, -1), spec["row_pad"]),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), spec["row_pad"]),
+            *_plain_cell_commands(preset),
+        ])
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), BRAND_MID),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [WHITE, ROW_ALT]),
+        ("TOPPADDING", (0, 0), (-1, 0), spec["header_pad"]),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), spec["header_pad"]),
+        ("LEFTPADDING", (0, 0), (-1, -1), spec["side_pad"]),
+        ("RIGHTPADDING", (0, 0), (-1, -1), spec["side_pad"]),
+        ("TOPPADDING", (0, 1), (-1, -1), spec["row_pad"]),
+        ("BOTTOMPADDING", (0, 1), (-1, -1), spec["row_pad"]),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LINEBELOW", (0, 0), (-1, -1), 0.3, RULE),
+        ("LINEBELOW", (0, 0), (-1, 0), 0, WHITE),
+        ("BOX", (0, 0), (-1, -1), 0.8, BRAND_MID),
+        *_plain_cell_commands(preset),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _banner_styles():
+    header = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), BRAND_DARK),
+        ("TOPPADDING", (0, 0), (-1, -1), 14),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
+        ("LEFTPADDING", (0, 0), (-1, -1), 16),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 16),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (0, 0), (0, 0), "LEFT"),
+        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+    ])
+    accent = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), ACCENT),
+        ("TOPPADDING", (0, 0), (-1, -1), 0),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+    ])
+    return header, accent
+
+
+@lru_cache(maxsize=None)
+def _summary_style(columns, rows):
+    # Single-row card strips get more breathing room than card grids.
+    pad_y, pad_x = (12, 14) if rows == 1 else (10, 12)
+    commands = [
+        ("BACKGROUND", (0, 0), (-1, -1), BRAND_LIGHT),
+        ("TOPPADDING", (0, 0), (-1, -1), pad_y),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), pad_y),
+        ("LEFTPADDING", (0, 0), (-1, -1), pad_x),
+        ("RIGHTPADDING", (0, 0), (-1, -1), pad_x),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LINEAFTER", (0, 0), (columns - 2, -1), 0.5, CARD_RULE),
+    ]
+    if rows > 1:
+        commands.append(("LINEBELOW", (0, 0), (-1, rows - 2), 0.5, CARD_RULE))
+    return TableStyle(commands)
+
+
+# =========================
+# BUILDERS
+# =========================
+
+def report_header(title, subtitle, subtitle_size=16):
+    """Dark title banner with the amber accent bar underneath."""
+    header_style, accent_style = _banner_styles()
+    header = Table(
+        [[
+            Paragraph(title, report_styles()["title"]),
+            Paragraph(subtitle, subtitle_style(subtitle_size)),
+        ]],
+        colWidths=[PAGE_WIDTH * 0.7, PAGE_WIDTH * 0.3],
+    )
+    header.setStyle(header_style)
+    accent_bar = Table([[""]], colWidths=[PAGE_WIDTH], rowHeights=[4])
+    accent_bar.setStyle(accent_style)
+    return [header, accent_bar, Spacer(1, 10)]
+
+
+def section_heading(text):
+    return Paragraph(text, report_styles()["section"])
+
+
+def summary_cards(cards, value_size=16, columns=3):
+    """Grid of ``(label, value)`` cards, ``columns`` per row."""
+    label_style = report_styles()["label"]
+    value_style = card_value_style(value_size)
+    cells = [[Paragraph(label, label_style), Paragraph(str(value), value_style)] for label, value in cards]
+    rows = [cells[i:i + columns] for i in range(0, len(cells), columns)]
+    table = Table(rows, colWidths=[PAGE_WIDTH / columns] * columns)
+    table.setStyle(_summary_style(columns, len(rows)))
+    return table
+
+
+def spacer(height):
+    return Spacer(1, height)
+
+
+def divider(footer=False, before=14, after=6):
+    """Horizontal rule between sections; ``footer`` uses the lighter closing rule."""
+    return [
+        Spacer(1, before),
+        HRFlowable(width="100%", thickness=0.5, color=FOOTER_RULE if footer else RULE),
+        Spacer(1, after),
+    ]
+
+
+def cell_markup(html, preset="regular"):
+    """A table cell from inline ReportLab markup, in the preset's cell style."""
+    return Paragraph(html, table_cell_styles(preset)[1])
+
+
+def footer_note(html):
+    return Paragraph(html, report_styles()["footer"])
+
+
+def data_table(headers, rows, col_fractions, preset="regular", bold_column=None, chunk_rows=TABLE_CHUNK_ROWS):
+    """
+    Build a data table as a list of flowables. ``rows`` hold plain strings
+    (wrapped in the preset's cell style) or ready flowables; ``bold_column``
+    gets the emphasis style.
+
+    Rows are emitted as consecutive ``LongTable`` chunks of ``chunk_rows``,
+    each repeating the header. Platypus re-measures the remainder of a
+    table every time it splits across a page, so one big table lays out in
+    quadratic time; fixed-size chunks keep it linear in the row count.
+    """
+    header_style, cell_style, bold_style = table_cell_styles(preset)
+    header_row = [Paragraph(header, header_style) for header in headers]
+    col_widths = [PAGE_WIDTH * fraction for fraction in col_fractions]
+    table_style = data_table_style(preset)
+    # Short markup-free text that fits on one line is drawn as a plain
+    # string, skipping Paragraph parsing and line breaking for most cells.
+    text_widths = [width - 2 * TABLE_PRESETS[preset]["side_pad"] for width in col_widths]
+
+    def cell(value, col_idx):
+        if not isinstance(value, str):
+            return value
+        if col_idx == bold_column:
+            return Paragraph(value, bold_style)
+        if (
+            "<" not in value
+            and "&" not in value
+            and stringWidth(value, cell_style.fontName, cell_style.fontSize) <= text_widths[col_idx]
+        ):
+            return value
+        return Paragraph(value, cell_style)
+
+    def chunk_table(chunk):
+        table = LongTable([header_row, *chunk], colWidths=col_widths, repeatRows=1)
+        table.setStyle(table_style)
+        return table
+
+    tables = []
+    chunk = []
+    for row in rows:
+        chunk.append([cell(value, col_idx) for col_idx, value in enumerate(row)])
+        if len(chunk) >= chunk_rows:
+            tables.append(chunk_table(chunk))
+            chunk = []
+    if chunk or not tables:
+        tables.append(chunk_table(chunk))
+    return tables
+
+
+def page_footer(label):
+    """``onPage`` callback drawing ``label`` and the page number."""
+    font_name = report_fonts()[0]
+
+    def draw(canvas_obj, doc_obj):
+        canvas_obj.saveState()
+        canvas_obj.setFont(font_name, 8)
+        canvas_obj.setFillColor(PAGE_FOOTER_TEXT)
+        canvas_obj.drawString(10 * mm, 10 * mm, label)
+        canvas_obj.drawRightString(A4[0] - 10 * mm, 10 * mm, f"Page {doc_obj.page}")
+        canvas_obj.setStrokeColor(FOOTER_RULE)
+        canvas_obj.line(10 * mm, 13 * mm, A4[0] - 10 * mm, 13 * mm)
+        canvas_obj.restoreState()
+
+    return draw
+
+
+def render_pdf(story, title, author="", footer_label=None, margin_y=12):
+    """Lay out ``story`` on A4 and return the PDF bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=10 * mm,
+        rightMargin=10 * mm,
+        topMargin=margin_y * mm,
+        bottomMargin=margin_y * mm,
+        title=title,
+        author=author,
+    )
+    if footer_label:
+        on_page = page_footer(footer_label)
+        doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    else:
+        doc.build(story)
+    payload = buffer.getvalue()
+    buffer.close()
+    return payload
+
+
+def pdf_response(payload, filename):
+    with report_phase("serialize"):
+        response = HttpResponse(content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response.write(payload)
+    return response
@@ -0,0 +1,200 @@
+import logging
+import multiprocessing
+import threading
+import tracemalloc
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from ..responses import FastJsonResponse
+from .metrics import current_trace, record_render_peak, report_phase, trace_memory_enabled
+from .pdf import pdf_response
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDER_TIMEOUT = 60
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ReportRenderTimeout(Exception):
+    pass
+
+
+class ReportRenderUnavailable(Exception):
+    pass
+
+
+def _init_render_process():
+    # Spawned children start from a fresh interpreter: load the app registry
+    # so the report modules can be imported to resolve the render function.
+    import django
+
+    django.setup()
+
+
+def _traced_render(render, report):
+    """Run ``render`` in a pool process and return ``(payload, tracemalloc peak)``."""
+    tracemalloc.start()
+    try:
+        payload = render(report)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return payload, peak
+
+
+def render_workers():
+    return getattr(settings, "REPORT_RENDER_WORKERS", DEFAULT_RENDER_WORKERS)
+
+
+def render_timeout():
+    return getattr(settings, "REPORT_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=render_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_render_process,
+            )
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop ``pool`` (if it is still current) and kill its processes."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # A timed-out render keeps its process busy until it finishes; terminate
+    # the workers so the slot is not lost. Other in-flight renders on this
+    # pool fail with BrokenProcessPool.
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_render_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def render_in_pool(render, report):
+    """
+    Run ``render(report)`` in the render process pool and return its bytes.
+
+    ``render`` must be a module-level function and ``report`` a picklable
+    dict. Renders run inline when the pool is disabled
+    (``REPORT_RENDER_WORKERS = 0``) or when already inside a worker process,
+    such as the background report worker.
+    """
+    with report_phase("render"):
+        if render_workers() <= 0 or multiprocessing.parent_process() is not None:
+            return render(report)
+
+        # Inside an instrumented report the child measures its own peak memory.
+        traced = current_trace() is not None and trace_memory_enabled()
+        pool = _get_pool()
+        try:
+            if traced:
+                future = pool.submit(_traced_render, render, report)
+            else:
+                future = pool.submit(render, report)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            _discard_pool(pool)
+            raise ReportRenderUnavailable(str(exc)) from exc
+
+        try:
+            result = future.result(timeout=render_timeout())
+        except FutureTimeoutError as exc:
+            if not future.cancel():
+                _discard_pool(pool)
+            raise ReportRenderTimeout(f"{render.__name__} exceeded {render_timeout()}s") from exc
+        except (BrokenProcessPool, CancelledError) as exc:
+            _discard_pool(pool)
+            raise ReportRenderUnavailable(str(exc) or "render cancelled") from exc
+
+    if traced:
+        payload, peak = result
+        record_render_peak(peak)
+        return payload
+    return result
+
+
+def render_each_in_pool(render, reports):
+    """
+    Render every report in ``reports`` and yield ``(report, payload)`` in
+    input order, keeping at most two renders per worker in flight.
+
+    ``payload`` is ``None`` when that render timed out or its process died;
+    the pool is replaced and the remaining reports carry on.
+    """
+    reports = iter(reports)
+    if render_workers() <= 0 or multiprocessing.parent_process() is not None:
+        for report in reports:
+            yield report, render(report)
+        return
+
+    window = render_workers() * 2
+    pending = deque()
+
+    def submit(report):
+        pool = _get_pool()
+        pending.append((report, pool, pool.submit(render, report)))
+
+    for report in reports:
+        submit(report)
+        if len(pending) >= window:
+            break
+
+    while pending:
+        report, pool, future = pending.popleft()
+        payload = None
+        try:
+            payload = future.result(timeout=render_timeout())
+        except FutureTimeoutError:
+            logger.warning("PDF render timed out: %s", render.__name__)
+            if not future.cancel():
+                _discard_pool(pool)
+        except (BrokenProcessPool, CancelledError):
+            if pool is not _pool:
+                # Collateral of an earlier timeout on the old pool: retry it.
+                submit(report)
+                pending.rotate(1)
+                continue
+            logger.exception("PDF render pool broke: %s", render.__name__)
+            _discard_pool(pool)
+        yield report, payload
+
+        next_report = next(reports, None)
+        if next_report is not None:
+            submit(next_report)
+
+
+def pooled_pdf_response(render, report, filename):
+    """Render ``report`` off the request thread and wrap the bytes as a PDF download."""
+    try:
+        payload = render_in_pool(render, report)
+    except ReportRenderTimeout:
+        logger.warning("PDF render timed out: %s (%s)", render.__name__, filename)
+        return FastJsonResponse(
+            {"detail": "Report took too long to render. Try the background export."},
+            status=504,
+        )
+    except ReportRenderUnavailable:
+        logger.exception("PDF render pool unavailable: %s (%s)", render.__name__, filename)
+        return FastJsonResponse({"detail": "Report renderer is unavailable. Try again."}, status=503)
+    return pdf_response(payload, filename)
@@ -0,0 +1,65 @@
+import logging
+
+from ..aggregates import department_data_version
+from ..models import Department, Project
+from ..project_d.overall import generate_category_csv_report, generate_category_pdf_report
+from .artifacts import artifact_key, lookup_artifact, response_filename, response_payload, store_artifact
+from .jobs import REPORT_GENERATORS
+
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_FORMATS = ("csv", "pdf")
+
+
+def _category_report(dept, params, file_format):
+    if file_format == "pdf":
+        return generate_category_pdf_report(dept, params["category"])
+    return generate_category_csv_report(dept, params["category"])
+
+
+def standard_reports():
+    """
+    ``(report_type, params, generator)`` for the reports managers download
+    most. Params match the ones the report views cache under, so a
+    pre-rendered file is served to the next matching request.
+    """
+    reports = [
+        ("main", {}, REPORT_GENERATORS["main"]),
+        ("team", {}, REPORT_GENERATORS["team"]),
+    ]
+    for category_key, _label in Project.PROJECT_CATEGORY:
+        reports.append(("category", {"category": category_key}, _category_report))
+    return reports
+
+
+def prerender_department(dept_id, formats=PRERENDER_FORMATS, force=False):
+    """
+    Render every standard report of one department into the artifact store.
+    Runs inside a worker process; all reports share one department snapshot.
+    Returns ``{"rendered": n, "cached": n, "failed": n}``.
+    """
+    counts = {"rendered": 0, "cached": 0, "failed": 0}
+    dept = Department.objects.get(id=dept_id)
+    # Read the version once, before any data is loaded: a change during the
+    # run then leaves artifacts under the older key instead of storing old
+    # data under the new one.
+    version = department_data_version(dept.id)
+    for report_type, params, generator in standard_reports():
+        for file_format in formats:
+            key = artifact_key(dept.id, report_type, file_format, params, version=version)
+            if not force and lookup_artifact(key) is not None:
+                counts["cached"] += 1
+                continue
+            try:
+                response = generator(dept, params, file_format)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Report generator returned HTTP {response.status_code}")
+                extension = "pdf" if file_format == "pdf" else "xlsx"
+                filename = response_filename(response, f"{report_type}_report.{extension}")
+                store_artifact(key, filename, response_payload(response))
+                counts["rendered"] += 1
+            except Exception:
+                logger.exception("Pre-render failed: department %s %s %s %s", dept_id, report_type, file_format, params)
+                counts["failed"] += 1
+    return counts
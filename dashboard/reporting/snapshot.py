@@ -0,0 +1,166 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from ..aggregates import department_data_version, split_project_amount
+from ..models import ProjectMember
+
+
+class DepartmentSnapshot:
+    """
+    Every worker, project and membership of one department, loaded in three
+    queries. The report builders slice this instead of querying, so a
+    request or job that produces several reports reads the department once.
+
+    Projects are kept newest first and workers by name, the order every
+    report lists them in. Derived figures (payout splits, worker names,
+    per-worker totals) are computed lazily and memoized.
+    """
+
+    def __init__(self, dept):
+        self.dept = dept
+        self.workers = list(dept.workers.order_by("name", "id"))
+        self.projects = list(dept.projects.order_by("-start_date", "-id"))
+        self.workers_by_id = {worker.id: worker for worker in self.workers}
+
+        self.members_by_project = defaultdict(list)
+        # Member names come with the memberships: a member's worker may
+        # belong to another department and be missing from ``workers``.
+        self.member_names = {}
+        memberships = (
+            ProjectMember.objects.filter(project__department=dept)
+            .order_by("project_id", "id")
+            .values_list("project_id", "id", "worker_id", "contribution", "worker__name")
+        )
+        for project_id, member_id, worker_id, contribution, worker_name in memberships:
+            self.members_by_project[project_id].append((member_id, worker_id, contribution))
+            self.member_names[worker_id] = worker_name
+
+        self._payouts = {}
+        self._worker_projects = None
+        self._worker_income = None
+        self._worker_normalizers = None
+
+    # ---- projects ----
+
+    def projects_for(self, category=None, start_date=None, end_date=None):
+        """Projects (newest first) in ``category`` started within ``[start_date, end_date]``."""
+        return [
+            project
+            for project in self.projects
+            if (category is None or project.category == category)
+            and (start_date is None or project.start_date >= start_date)
+            and (end_date is None or project.start_date <= end_date)
+        ]
+
+    def worker_names(self, project):
+        """Names of the project's workers, in the order they were assigned."""
+        return [
+            self.member_names[worker_id]
+            for _member_id, worker_id, _contribution in self.members_by_project.get(project.id, ())
+        ]
+
+    def payouts(self, project):
+        """``{member_id: share}`` for one project, per the gold / silver / copper split."""
+        payouts = self._payouts.get(project.id)
+        if payouts is None:
+            members = self.members_by_project.get(project.id, ())
+            payouts = split_project_amount(project.amount, [(member_id, contribution) for member_id, _w, contribution in members])
+            self._payouts[project.id] = payouts
+        return payouts
+
+    @staticmethod
+    def total_amount(projects):
+        return sum((Decimal(project.amount) for project in projects if project.amount is not None), Decimal("0.00"))
+
+    # ---- workers ----
+
+    def worker_income(self, projects=None):
+        """``{worker_id: income}`` over ``projects`` (default: every project)."""
+        if projects is None and self._worker_income is not None:
+            return self._worker_income
+        income = defaultdict(lambda: Decimal("0.00"))
+        for project in self.projects if projects is None else projects:
+            payouts = self.payouts(project)
+            for member_id, worker_id, _contribution in self.members_by_project.get(project.id, ()):
+                income[worker_id] += payouts.get(member_id, Decimal("0.00"))
+        income = dict(income)
+        if projects is None:
+            self._worker_income = income
+        return income
+
+    def worker_projects(self, worker_id):
+        """Projects (newest first) the worker is assigned to."""
+        if self._worker_projects is None:
+            grouped = defaultdict(list)
+            for project in self.projects:
+                for worker in {worker for _m, worker, _c in self.members_by_project.get(project.id, ())}:
+                    grouped[worker].append(project)
+            self._worker_projects = grouped
+        return self._worker_projects.get(worker_id, [])
+
+    def worker_member_id(self, project, worker_id):
+        for member_id, member_worker_id, _contribution in self.members_by_project.get(project.id, ()):
+            if member_worker_id == worker_id:
+                return member_id
+        return None
+
+    def worker_normalizers(self):
+        """
+        Department-wide maxima the worker performance score is scaled
+        against: income, assigned project count and average project amount.
+        """
+        if self._worker_normalizers is not None:
+            return self._worker_normalizers
+
+        max_worker_income = max(self.worker_income().values(), default=Decimal("1.00"))
+        if max_worker_income <= 0:
+            max_worker_income = Decimal("1.00")
+
+        project_counts = defaultdict(set)
+        amount_totals = defaultdict(lambda: [Decimal("0.00"), 0])
+        for project in self.projects:
+            for _member_id, worker_id, _contribution in self.members_by_project.get(project.id, ()):
+                project_counts[worker_id].add(project.id)
+                if project.amount is not None:
+                    totals = amount_totals[worker_id]
+                    totals[0] += Decimal(project.amount)
+                    totals[1] += 1
+
+        max_project_count = max((len(ids) for ids in project_counts.values()), default=1)
+        max_avg_project_amount = max(
+            (
+                (amount_totals[worker_id][0] / amount_totals[worker_id][1]) if amount_totals[worker_id][1] else Decimal("0.00")
+                for worker_id in project_counts
+            ),
+            default=Decimal("1.00"),
+        )
+        if max_avg_project_amount <= 0:
+            max_avg_project_amount = Decimal("1.00")
+
+        self._worker_normalizers = {
+            "max_project_count": max_project_count,
+            "max_worker_income": max_worker_income,
+            "max_avg_project_amount": max_avg_project_amount,
+        }
+        return self._worker_normalizers
+
+
+def cached_snapshot(dept):
+    """The snapshot already loaded for ``dept`` in this request or job, if any."""
+    cached = getattr(dept, "_report_snapshot", None)
+    return cached[1] if cached is not None else None
+
+
+def department_snapshot(dept):
+    """
+    The :class:`DepartmentSnapshot` for ``dept``, memoized on the instance.
+    Views and jobs load the department once, so this is request/job scoped;
+    a data change (new data version) loads a fresh snapshot.
+    """
+    version = department_data_version(dept.id)
+    cached = getattr(dept, "_report_snapshot", None)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    snapshot = DepartmentSnapshot(dept)
+    dept._report_snapshot = (version, snapshot)
+    return snapshot
@@ -0,0 +1,70 @@
+import csv
+import zipfile
+
+from django.http import StreamingHttpResponse
+
+
+STREAM_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the encoded line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(filename, rows):
+    """
+    Stream ``rows`` (any iterable of sequences) as CSV. Rows are pulled
+    lazily, so the first bytes go out before the last database row is read.
+    """
+    writer = csv.writer(_Echo(), lineterminator="\n")
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type="text/csv; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+class _ZipSink:
+    """Unseekable sink for ``ZipFile``; ``drain`` hands back what was written."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def streaming_zip_response(filename, entries):
+    """
+    Stream a ZIP built from ``entries``, an iterable of ``(name, bytes)``.
+    Each member is sent as soon as it is compressed; only one member is
+    held in memory at a time.
+    """
+    def chunks():
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, payload in entries:
+                archive.writestr(name, payload)
+                yield sink.drain()
+        yield sink.drain()
+
+    response = StreamingHttpResponse(chunks(), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def money(value):
+    return f"{value or 0:.2f}"
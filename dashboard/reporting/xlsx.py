@@ -0,0 +1,144 @@
+import tempfile
+
+from django.http import FileResponse
+
+from ..responses import FastJsonResponse
+from .metrics import record_rows, report_phase
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Workbooks smaller than this stay in memory; larger ones roll over to disk.
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+HEADER_FILL = "2E5FA3"
+
+
+def _named_styles():
+    left = Alignment(horizontal="left", vertical="center")
+    left_wrap = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    return [
+        NamedStyle(name="report_label", font=Font(bold=True), alignment=left),
+        NamedStyle(name="report_value", alignment=left),
+        NamedStyle(name="report_value_wrap", alignment=left_wrap),
+        NamedStyle(
+            name="report_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill("solid", fgColor=HEADER_FILL),
+            alignment=left,
+        ),
+    ]
+
+
+def openpyxl_missing_response():
+    return FastJsonResponse(
+        {"detail": "Excel generation dependency missing. Install openpyxl."},
+        status=500,
+    )
+
+
+class ReportSheet:
+    """
+    Row-by-row writer over an openpyxl write-only worksheet.
+
+    Every cell references one of the workbook's named styles, so no
+    per-cell ``Font``/``Alignment`` objects are created.
+    """
+
+    def __init__(self, worksheet):
+        self.ws = worksheet
+        self.row_count = 0
+
+    def _cell(self, value, style):
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+    def append(self, values, style="report_value", wrap_columns=(), styles=None):
+        """
+        Write one row. ``styles`` gives a style per column; otherwise every
+        cell uses ``style`` and the 1-based ``wrap_columns`` wrap their text.
+        """
+        row = []
+        for col_idx, value in enumerate(values, start=1):
+            if styles is not None:
+                cell_style = styles[col_idx - 1]
+            elif col_idx in wrap_columns:
+                cell_style = "report_value_wrap"
+            else:
+                cell_style = style
+            row.append(self._cell(value, cell_style))
+        self.ws.append(row)
+        self.row_count += 1
+
+    def append_merged(self, label, value, last_column, label_style="report_label"):
+        """Write ``label`` in column A and ``value`` merged across B..``last_column``."""
+        self.append([label, value], styles=[label_style, "report_value"])
+        self.merge(2, last_column)
+
+    def append_title(self, text, last_column=None):
+        self.append([text], style="report_label")
+        if last_column:
+            self.merge(1, last_column)
+
+    def header(self, headers, style="report_header"):
+        self.append(headers, style=style)
+
+    def blank(self, count=1):
+        for _ in range(count):
+            self.ws.append([])
+            self.row_count += 1
+
+    def merge(self, first_column, last_column):
+        row = self.row_count
+        self.ws.merged_cells.add(
+            f"{get_column_letter(first_column)}{row}:{get_column_letter(last_column)}{row}"
+        )
+
+
+class ReportWorkbook:
+    """
+    Write-only workbook with the report named styles registered once.
+
+    Sheets must be fully configured (column widths, frozen panes) when they
+    are created because write-only sheets emit their header on the first row.
+    """
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        self.sheets = []
+        for named_style in _named_styles():
+            self.wb.add_named_style(named_style)
+
+    def add_sheet(self, title, column_widths, freeze_panes=None):
+        worksheet = self.wb.create_sheet(title=title)
+        for col_idx, width in enumerate(column_widths, start=1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+        if freeze_panes:
+            worksheet.freeze_panes = freeze_panes
+        sheet = ReportSheet(worksheet)
+        self.sheets.append(sheet)
+        return sheet
+
+    def response(self, filename):
+        """Save to a spooled temporary file and stream it back as an attachment."""
+        record_rows(sum(sheet.row_count for sheet in self.sheets))
+        with report_phase("serialize"):
+            spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            self.wb.save(spool)
+            spool.seek(0)
+        return FileResponse(
+            spool,
+            as_attachment=True,
+            filename=filename,
+            content_type=XLSX_CONTENT_TYPE,
+        )
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .aggregates import bump_department_data_version
+from .middleware import invalidate_cached_department
+from .models import Department, Project, ProjectMember, Worker
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def _invalidate_cached_department(sender, instance, **kwargs):
+    invalidate_cached_department(instance.pk)
+
+
+@receiver(post_save, sender=Department)
+def _bump_on_department_change(sender, instance, created, **kwargs):
+    # Report titles, footers and filenames carry the department name, so
+    # an edit must move the cached artifacts to a new key.
+    if not created:
+        bump_department_data_version(instance.pk)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def _bump_on_department_child_change(sender, instance, **kwargs):
+    bump_department_data_version(instance.department_id)
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def _bump_on_membership_change(sender, instance, **kwargs):
+    # Payout splits depend on every member, so a membership change marks
+    # its project as changed for incremental analytics exports.
+    Project.objects.filter(pk=instance.project_id).update(updated_at=timezone.now())
+    department_id = (
+        Project.objects.filter(pk=instance.project_id)
+        .values_list("department_id", flat=True)
+        .first()
+    )
+    # When the project itself is being deleted its own post_delete bumps the version.
+    if department_id is not None:
+        bump_department_data_version(department_id)
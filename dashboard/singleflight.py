@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+import uuid
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_TIMEOUT = 120
+DEFAULT_WAIT_TIMEOUT = 60
+
+POLL_INITIAL_DELAY = 0.05
+POLL_MAX_DELAY = 0.5
+
+# Per-key locks for callers in this process. Entries disappear once no
+# caller holds a reference to the lock.
+_local_locks = weakref.WeakValueDictionary()
+_local_locks_guard = threading.Lock()
+
+
+def lock_timeout():
+    return getattr(settings, "SINGLE_FLIGHT_LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)
+
+
+def wait_timeout():
+    return getattr(settings, "SINGLE_FLIGHT_WAIT_TIMEOUT", DEFAULT_WAIT_TIMEOUT)
+
+
+def _local_lock(key):
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _local_locks[key] = lock
+        return lock
+
+
+def _lock_key(key):
+    return f"dashboard:single-flight:{key}"
+
+
+def _acquire_cache_lock(key, lookup, deadline):
+    """
+    Take the cache lock for ``key``, or wait for its holder to publish a
+    value. Returns ``(token, value)``: a token when the lock was taken, a
+    value when another process produced it, neither when the wait ran out.
+    """
+    token = uuid.uuid4().hex
+    delay = POLL_INITIAL_DELAY
+    while True:
+        if cache.add(_lock_key(key), token, lock_timeout()):
+            return token, None
+        value = lookup()
+        if value is not None:
+            return None, value
+        if time.monotonic() >= deadline:
+            return None, None
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_DELAY)
+
+
+def _release_cache_lock(key, token):
+    # Only drop the lock if it is still ours; it may have expired and been
+    # taken by another caller while ``compute`` ran.
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def single_flight(key, lookup, compute):
+    """
+    Return ``lookup()`` if it has a value, otherwise run ``compute()`` once
+    for all concurrent callers of ``key``.
+
+    ``compute`` must store its result where ``lookup`` finds it; the first
+    caller computes while the others wait and then read the stored value.
+    Callers in the same process queue on a local lock, callers in other
+    processes on a lock in the cache backend (``cache.add``). With a
+    per-process cache such as LocMemCache the local lock alone does the
+    de-duplication.
+
+    A ``lookup`` that still finds nothing after the leader finished (it
+    failed, or returned something it did not store) makes the next waiter
+    compute. Waiting is capped at ``SINGLE_FLIGHT_WAIT_TIMEOUT`` seconds,
+    after which the caller computes on its own.
+    """
+    value = lookup()
+    if value is not None:
+        return value
+
+    deadline = time.monotonic() + wait_timeout()
+    local = _local_lock(key)
+    if not local.acquire(timeout=wait_timeout()):
+        logger.warning("Single-flight wait timed out, computing anyway: %s", key)
+        return compute()
+    try:
+        value = lookup()
+        if value is not None:
+            return value
+
+        token, value = _acquire_cache_lock(key, lookup, deadline)
+        if value is not None:
+            return value
+        if token is None:
+            logger.warning("Single-flight wait timed out, computing anyway: %s", key)
+            return compute()
+        try:
+            # Another process may have stored it just before we got the lock.
+            value = lookup()
+            if value is not None:
+                return value
+            return compute()
+        finally:
+            _release_cache_lock(key, token)
+    finally:
+        local.release()
@@ -0,0 +1,52 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.storage import storages
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PRECOMPRESS_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt", ".html", ".map")
+
+
+class PrecompressedStaticFilesStorage(StaticFilesStorage):
+    """
+    Write ``.gz`` (and ``.br`` when brotli is installed) siblings next to
+    text assets during ``collectstatic`` so the front web server can serve
+    them directly (nginx ``gzip_static`` / ``brotli_static``).
+    """
+
+    min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        for name in paths:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            source_path = self.path(name)
+            with open(source_path, "rb") as source:
+                payload = source.read()
+            if len(payload) < self.min_size:
+                continue
+
+            self._write_sibling(source_path + ".gz", gzip.compress(payload, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._write_sibling(source_path + ".br", brotli.compress(payload))
+            yield name, name, True
+
+    def _write_sibling(self, path, payload):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, path)
+
+
+def report_job_storage():
+    """Private storage for background report files (the ``report_jobs`` alias)."""
+    return storages["report_jobs"]
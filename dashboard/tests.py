@@ -1,3 +1,368 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve, reverse
+
+from .login_protection import arecord_login_failure, areset_login_failures, athrottle_login
+from .middleware import DepartmentMiddleware
+from .reporting.artifacts import (
+    artifact_key,
+    cached_report_response,
+    evict_artifacts,
+    lookup_artifact,
+    store_artifact,
+)
+from .reporting.downloads import RangeNotSatisfiable, file_download_response, parse_byte_range
+from .singleflight import single_flight
+
+
+CONTENT = bytes(range(256)) * 4
+ETAG = "report-abc"
+
+
+class ParseByteRangeTests(SimpleTestCase):
+    def test_ignored_headers(self):
+        for header in (None, "", "items=0-1", "bytes=abc", "bytes=0-1,4-5", "bytes=-", "bytes=5-2"):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_byte_range(header, 100))
+
+    def test_ranges(self):
+        self.assertEqual(parse_byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_byte_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=90-500", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=-500", 100), (0, 99))
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=100-", "bytes=999999-", "bytes=-0"):
+            with self.subTest(header=header):
+                with self.assertRaises(RangeNotSatisfiable):
+                    parse_byte_range(header, 100)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_byte_range("bytes=-5", 0)
+
+
+class FileDownloadResponseTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def download(self, **headers):
+        request = self.factory.get("/download", headers=headers)
+        return file_download_response(request, io.BytesIO(CONTENT), len(CONTENT), "report.pdf", ETAG)
+
+    def body(self, response):
+        try:
+            return b"".join(response.streaming_content)
+        finally:
+            response.close()
+
+    def test_full_download(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], f'"{ETAG}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(self.body(response), CONTENT)
+
+    def test_if_none_match(self):
+        for header in (f'"{ETAG}"', f'W/"{ETAG}"', f'"other", "{ETAG}"', "*"):
+            with self.subTest(header=header):
+                response = self.download(if_none_match=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], f'"{ETAG}"')
+
+    def test_if_none_match_stale(self):
+        response = self.download(if_none_match='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+
+    def test_range(self):
+        response = self.download(range="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(CONTENT)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(self.body(response), CONTENT[100:200])
+
+    def test_suffix_range(self):
+        response = self.download(range="bytes=-24")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 1000-1023/{len(CONTENT)}")
+        self.assertEqual(self.body(response), CONTENT[-24:])
+
+    def test_open_range_is_clamped(self):
+        response = self.download(range="bytes=1000-5000")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 1000-1023/{len(CONTENT)}")
+        self.assertEqual(self.body(response), CONTENT[1000:])
+
+    def test_range_not_satisfiable(self):
+        response = self.download(range=f"bytes={len(CONTENT)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+        self.assertEqual(response["ETag"], f'"{ETAG}"')
+
+    def test_multiple_ranges_send_whole_file(self):
+        response = self.download(range="bytes=0-9,20-29")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+
+    def test_if_range_matching_etag(self):
+        response = self.download(range="bytes=10-19", if_range=f'"{ETAG}"')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), CONTENT[10:20])
+
+    def test_if_range_stale_etag(self):
+        response = self.download(range="bytes=10-19", if_range='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Range", response)
+        self.assertEqual(self.body(response), CONTENT)
+
+    def test_if_range_weak_etag(self):
+        # If-Range needs a strong match.
+        response = self.download(range="bytes=10-19", if_range=f'W/"{ETAG}"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+
+    def test_if_range_date(self):
+        response = self.download(range="bytes=10-19", if_range="Wed, 21 Oct 2015 07:28:00 GMT")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+
+    def test_if_range_stale_skips_416(self):
+        response = self.download(range=f"bytes={len(CONTENT)}-", if_range='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+
+
+class ArtifactCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        settings_override = override_settings(REPORT_ARTIFACT_DIR=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        version = mock.patch("dashboard.reporting.artifacts.department_data_version", return_value=1)
+        self.data_version = version.start()
+        self.addCleanup(version.stop)
+        self.dept = SimpleNamespace(id=1)
+        self.factory = RequestFactory()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        response = HttpResponse(CONTENT, content_type="application/pdf")
+        response["Content-Disposition"] = 'attachment; filename="main_report.pdf"'
+        return response
+
+    def download(self, **headers):
+        request = self.factory.get("/reports/main/pdf/", headers=headers)
+        response = cached_report_response(request, self.dept, "main", "pdf", {}, self.build)
+        self.addCleanup(response.close)
+        return response
+
+    def test_key_changes_with_data_version(self):
+        key = artifact_key(1, "main", "pdf")
+        self.assertEqual(key, artifact_key(1, "main", "pdf", version=1))
+        self.data_version.return_value = 2
+        self.assertNotEqual(key, artifact_key(1, "main", "pdf"))
+        self.assertNotEqual(key, artifact_key(1, "main", "pdf", {"worker_id": 3}, version=1))
+
+    def test_repeat_download_is_served_from_disk(self):
+        first = self.download()
+        self.assertEqual(b"".join(first.streaming_content), CONTENT)
+        second = self.download()
+        self.assertEqual(b"".join(second.streaming_content), CONTENT)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+        self.data_version.return_value = 2
+        self.download()
+        self.assertEqual(self.builds, 2)
+
+    def test_if_none_match_gets_304(self):
+        etag = self.download()["ETag"]
+        response = self.download(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.builds, 1)
+
+    def test_error_responses_are_not_cached(self):
+        self.build = lambda: HttpResponse(status=503)
+        self.assertEqual(self.download().status_code, 503)
+        self.assertIsNone(lookup_artifact(artifact_key(1, "main", "pdf")))
+
+    def test_eviction_drops_least_recently_used(self):
+        paths = {name: store_artifact(name * 64, f"{name}.pdf", b"x" * 100) for name in "abc"}
+        for age, name in enumerate("abc", start=1):
+            stat = os.stat(paths[name])
+            os.utime(paths[name], ns=(stat.st_atime_ns - age * 10**9, stat.st_mtime_ns))
+        # A lookup marks "c", the oldest, as just used.
+        self.assertEqual(lookup_artifact("c" * 64), paths["c"])
+
+        self.assertEqual(evict_artifacts(max_bytes=200), 1)
+        self.assertFalse(paths["b"].exists())
+        self.assertTrue(paths["a"].exists())
+        self.assertTrue(paths["c"].exists())
+
+    def test_lookup_keeps_modification_time(self):
+        path = store_artifact("d" * 64, "d.pdf", b"x")
+        mtime = os.stat(path).st_mtime_ns
+        lookup_artifact("d" * 64)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_callers_compute_once(self):
+        store = {}
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            store["value"] = "rendered"
+            return "rendered"
+
+        results = []
+
+        def call():
+            results.append(single_flight("test-key", lambda: store.get("value"), compute))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(started.wait(5))
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["rendered"] * 5)
+
+    def test_stored_value_skips_compute(self):
+        compute = mock.Mock()
+        self.assertEqual(single_flight("test-key", lambda: "cached", compute), "cached")
+        compute.assert_not_called()
+
+    def test_failed_leader_lets_next_caller_compute(self):
+        def fail():
+            raise RuntimeError("render failed")
+
+        with self.assertRaises(RuntimeError):
+            single_flight("test-key", lambda: None, fail)
+        self.assertEqual(single_flight("test-key", lambda: None, lambda: "second"), "second")
+
+
+class DepartmentMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = DepartmentMiddleware(lambda request: HttpResponse("ok"))
+
+    def process(self, path, department=None, htmx=False):
+        request = self.factory.get(path)
+        request.session = {"department_id": department.id} if department else {}
+        request.htmx = htmx
+        with mock.patch("dashboard.middleware.get_cached_department", return_value=department):
+            self.middleware(request)
+            match = resolve(path)
+            return self.middleware.process_view(request, match.func, match.args, match.kwargs)
+
+    def test_logged_out_page_redirects_to_login(self):
+        response = self.process(reverse("base"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], reverse("login"))
+
+    def test_logged_out_htmx_request_gets_hx_redirect(self):
+        response = self.process(reverse("landing_overall"), htmx=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["HX-Redirect"], reverse("login"))
+
+    def test_logged_out_json_endpoint_gets_401(self):
+        response = self.process(reverse("analytics_export", args=["projects"]))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content), {"detail": "Unauthorized"})
+
+    def test_login_page_is_exempt(self):
+        self.assertIsNone(self.process(reverse("login")))
+
+    def test_logged_in_department_passes(self):
+        self.assertIsNone(self.process(reverse("base"), department=SimpleNamespace(id=1)))
+
+    def test_admin_views_are_exempt(self):
+        # ReportMetricAdmin overrides changelist_view in dashboard.admin.
+        self.assertIsNone(self.process("/admin/dashboard/reportmetric/"))
+        self.assertIsNone(self.process("/admin/"))
+
+
+@override_settings(
+    LOGIN_THROTTLE_CACHE="default",
+    LOGIN_THROTTLE_IP=(3, 1),
+    LOGIN_THROTTLE_EMAIL_IP=(2, 1),
+    LOGIN_THROTTLE_EMAIL=(4, 1),
+    SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies",
+)
+class LoginThrottleTests(SimpleTestCase):
+    email = "dept@example.com"
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def request(self, ip="10.0.0.1"):
+        return self.factory.post("/", REMOTE_ADDR=ip)
+
+    def throttle(self, ip="10.0.0.1"):
+        return async_to_sync(athrottle_login)(self.request(ip), self.email)
+
+    def fail(self, ip="10.0.0.1"):
+        async_to_sync(arecord_login_failure)(self.request(ip), self.email)
+
+    def test_ip_bucket_is_charged_per_attempt(self):
+        self.assertEqual([self.throttle() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(self.throttle(), 60)
+        self.assertEqual(self.throttle(ip="10.0.0.2"), 0)
+
+    def test_email_buckets_are_only_charged_by_failures(self):
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            self.assertEqual([self.throttle(ip) for _ in range(3)], [0, 0, 0])
+
+        # Nine allowed attempts charged neither email bucket.
+        self.fail(ip="10.0.0.4")
+        self.fail(ip="10.0.0.4")
+        self.assertEqual(self.throttle(ip="10.0.0.4"), 60)
+        self.assertEqual(self.throttle(ip="10.0.0.5"), 0)
+
+    def test_email_bucket_caps_failures_across_ips(self):
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"):
+            self.fail(ip)
+        self.assertEqual(self.throttle(ip="10.0.0.9"), 60)
+
+    def test_success_resets_failures(self):
+        self.fail()
+        self.fail()
+        async_to_sync(areset_login_failures)(self.request(), self.email)
+        self.assertEqual(self.throttle(ip="10.0.0.5"), 0)
+
+    def test_exhausted_bucket_returns_429_with_retry_after(self):
+        for _ in range(3):
+            self.throttle(ip="127.0.0.1")
+        response = self.client.post(reverse("login"), {"email": self.email, "password": "secret"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "60")
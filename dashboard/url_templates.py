@@ -0,0 +1,29 @@
+from functools import lru_cache
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import reverse
+
+
+ID_PLACEHOLDER = "{id}"
+_SENTINEL_ID = 987654321
+
+
+@lru_cache(maxsize=None)
+def url_template(route_name):
+    """Resolve ``route_name`` once and return its path with an ``{id}`` placeholder."""
+    return reverse(route_name, args=[_SENTINEL_ID]).replace(str(_SENTINEL_ID), ID_PLACEHOLDER)
+
+
+def object_url(route_name, object_id):
+    return url_template(route_name).replace(ID_PLACEHOLDER, str(object_id))
+
+
+def url_templates(**route_names):
+    return {key: url_template(route_name) for key, route_name in route_names.items()}
+
+
+@receiver(setting_changed)
+def _clear_url_templates(*, setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        url_template.cache_clear()
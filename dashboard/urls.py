@@ -11,6 +11,7 @@ urlpatterns = [
     path('landing/plot/', views.landing_plot, name="landing_plot"),
     path('landing/teambar/', views.landing_teambar, name="landing_teambar"),
     path('team/', views.team, name="team"),
+    path('api/team/workers/', views.team_workers_api, name="team_workers_api"),
     path('worker/<int:worker_id>/', views.worker_detail, name="worker_detail"),
     path('worker/<int:worker_id>/edit/', views.edit_worker, name="edit_worker"),
     path('worker/<int:worker_id>/delete/', views.delete_worker, name="delete_worker"),
@@ -29,8 +30,16 @@ urlpatterns = [
     path('reports/projects/listing/<str:category_key>/<str:file_format>/', views.project_listing_report, name="project_listing_report"),
     path('reports/main/<str:file_format>/', views.main_overall_report, name="main_overall_report"),
     path('reports/main-filter/<str:file_format>/', views.main_filter_report, name="main_filter_report"),
+    path('reports/main-compare/<str:file_format>/', views.main_comparison_report, name="main_comparison_report"),
     path('reports/team/<str:file_format>/', views.team_overall_report, name="team_overall_report"),
+    path('reports/pack/', views.department_report_pack, name="department_report_pack"),
+    path('reports/consolidated/', views.consolidated_report, name="consolidated_report"),
+    path('reports/team/workers/zip/', views.worker_reports_zip, name="worker_reports_zip"),
     path('reports/team/worker/<int:worker_id>/<str:file_format>/', views.worker_detail_report, name="worker_detail_report"),
+    path('exports/analytics/<str:dataset>/', views.analytics_export, name="analytics_export"),
+    path('reports/jobs/', views.report_job_enqueue, name="report_job_enqueue"),
+    path('reports/jobs/<int:job_id>/', views.report_job_status, name="report_job_status"),
+    path('reports/jobs/<int:job_id>/download/', views.report_job_download, name="report_job_download"),
     path('logout/', views.logout_view, name="logout"),
     path('test/', TemplateView.as_view(template_name='test.html'), name="test"),
  ]
@@ -1,24 +1,38 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
-from .models import Department
-from django.contrib.auth.hashers import check_password
+from django.http import Http404
+from .models import Department, ReportJob
 from django.views.decorators.http import require_http_methods
+from django.contrib.admin.views.decorators import staff_member_required
 from collections import defaultdict
+import heapq
+import os
 from decimal import Decimal
 from datetime import date, datetime, timedelta
 from urllib.parse import urlencode
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from django.db.models import Count, Sum, Value, DecimalField, Avg, Min
-from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models import Count, Sum, Value, DecimalField, Avg, Min, Q
+from django.db.models.functions import Coalesce, Lower, TruncMonth
 from django.contrib import messages
 from django.urls import reverse
-from .project_d.overall import generate_category_csv_report, generate_category_pdf_report
-from .project_d.listing import generate_project_listing_excel_report, generate_project_listing_pdf_report
-from .team_d.overall import generate_team_csv_report, generate_team_pdf_report
-from .team_d.worker import generate_worker_csv_report, generate_worker_pdf_report
-from .main_d.overall import generate_main_csv_report, generate_main_pdf_report
-from .main_d.fillter import generate_main_filter_csv_report, generate_main_filter_pdf_report
+from .aggregates import empty_worker_aggregate, split_project_amount, worker_aggregates
+from .login_protection import LoginBusy, acheck_password, arecord_login_failure, areset_login_failures, athrottle_login
+from .middleware import department_json_endpoint, department_login_not_required
+from .responses import FastJsonResponse
+from .url_templates import object_url, url_templates
+from .project_d.overall import generate_category_csv_report, generate_category_pdf_report, stream_category_csv_report
+from .project_d.listing import generate_project_listing_excel_report, generate_project_listing_pdf_report, normalize_listing_params, stream_project_listing_csv_report
+from .team_d.overall import generate_team_csv_report, generate_team_pdf_report, stream_team_csv_report
+from .team_d.worker import generate_worker_csv_report, generate_worker_pdf_report, generate_worker_reports_zip, stream_worker_csv_report
+from .main_d.overall import generate_main_csv_report, generate_main_pdf_report, stream_main_csv_report
+from .main_d.compare import generate_comparison_csv_report, generate_comparison_pdf_report
+from .main_d.fillter import generate_main_filter_csv_report, generate_main_filter_pdf_report, stream_main_filter_csv_report
+from .reporting.analytics import DATASETS, EXPORT_FORMATS, analytics_export_response, parse_since
+from .reporting.artifacts import cached_report_response
+from .reporting.consolidated import generate_consolidated_report
+from .reporting.downloads import file_download_response
+from .reporting.jobs import REPORT_GENERATORS, enqueue_report_job
+from .reporting.pack import generate_department_report_pack
 
 
 
@@ -28,14 +42,22 @@ from .main_d.fillter import generate_main_filter_csv_report, generate_main_filte
 
 
 
+@department_login_not_required
 @require_http_methods(["GET", "POST"])
-def login_page(request):
+async def login_page(request):
+    """
+    Async so a burst of logins waits on the bounded hashing pool instead of
+    running PBKDF2 on every request thread. Throttled attempts are rejected
+    before the department lookup and the hash.
+    """
 
     # Already logged in → go dashboard
-    if request.session.get("department_id"):
+    dept_id = await request.session.aget("department_id")
+    if dept_id and await Department.objects.filter(id=dept_id).aexists():
         return redirect("base")
 
     error = None
+    status = 200
 
     if request.method == "POST":
         email = request.POST.get("email", "").strip().lower()
@@ -44,22 +66,38 @@ def login_page(request):
         # basic validation
         if not email or not password:
             error = "Please enter email and password"
+        elif retry_after := await athrottle_login(request, email):
+            error = f"Too many login attempts. Try again in {retry_after} seconds."
+            status = 429
         else:
-            dept = Department.objects.filter(email=email).first()
-
-            if not dept:
-                error = "Department not found"
-            elif not check_password(password, dept.password):
-                error = "Invalid password"
+            dept = await Department.objects.filter(email=email).afirst()
+
+            try:
+                password_ok = dept is not None and await acheck_password(password, dept.password)
+            except LoginBusy:
+                error = "Too many people are signing in right now. Please try again."
+                status = 503
+                retry_after = 5
             else:
-                # create secure session
-                request.session.flush()  # remove old session
-                request.session["department_id"] = dept.id
-                request.session.set_expiry(60 * 60 * 8)  # 8 hours login
-                messages.success(request, "welcome back, " + dept.name + " - Income Management system!")
-                return redirect("base")
-
-    return render(request, "login.html", {"error": error})
+                if not dept:
+                    error = "Department not found"
+                    await arecord_login_failure(request, email)
+                elif not password_ok:
+                    error = "Invalid password"
+                    await arecord_login_failure(request, email)
+                else:
+                    await areset_login_failures(request, email)
+                    # create secure session
+                    await request.session.aflush()  # remove old session
+                    await request.session.aset("department_id", dept.id)
+                    await request.session.aset_expiry(60 * 60 * 8)  # 8 hours login
+                    messages.success(request, "welcome back, " + dept.name + " - Income Management system!")
+                    return redirect("base")
+
+    response = render(request, "login.html", {"error": error}, status=status)
+    if status != 200:
+        response["Retry-After"] = str(retry_after)
+    return response
 
 
 # =========================
@@ -69,15 +107,8 @@ from django.shortcuts import render
 from .models import Department, Worker, Project, ProjectMember
 
 
-def get_department(request):
-    dept_id = request.session.get("department_id")
-    return Department.objects.get(id=dept_id)
-
-
 def base(request):
-     if not request.session.get("department_id"):
-        return redirect("login")
-     dept = get_department(request)
+     dept = request.department
      initials = "".join([part[0] for part in dept.name.split()[:2]]).upper() if dept.name else "D"
      context = {
          "department": dept,
@@ -87,9 +118,7 @@ def base(request):
 
 
 def index(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     projects_qs = dept.projects.all()
     today = date.today()
 
@@ -245,14 +274,18 @@ def _build_overall_time_series(projects_qs, start_date, end_date, range_key):
     return labels, project_counts, incomes
 
 
-def _resolve_overall_filter(request):
+def _resolve_overall_filter(request, prefix=""):
+    """
+    Resolve the overall filter window from the query string. ``prefix``
+    reads a second window from prefixed parameters (``compare_range``, ...).
+    """
     today = date.today()
-    range_key = (request.GET.get("range") or "month").strip().lower()
-    day_date_raw = (request.GET.get("day_date") or "").strip()
-    month_value_raw = (request.GET.get("month_value") or "").strip()
-    year_value_raw = (request.GET.get("year_value") or "").strip()
-    custom_start_raw = (request.GET.get("start_date") or "").strip()
-    custom_end_raw = (request.GET.get("end_date") or "").strip()
+    range_key = (request.GET.get(f"{prefix}range") or "month").strip().lower()
+    day_date_raw = (request.GET.get(f"{prefix}day_date") or "").strip()
+    month_value_raw = (request.GET.get(f"{prefix}month_value") or "").strip()
+    year_value_raw = (request.GET.get(f"{prefix}year_value") or "").strip()
+    custom_start_raw = (request.GET.get(f"{prefix}start_date") or "").strip()
+    custom_end_raw = (request.GET.get(f"{prefix}end_date") or "").strip()
 
     if range_key == "today":
         try:
@@ -317,15 +350,24 @@ def _resolve_overall_filter(request):
         "selected_year": selected_year,
         "custom_start_raw": custom_start_raw,
         "custom_end_raw": custom_end_raw,
-        "report_querystring": urlencode(report_params),
+        "report_querystring": urlencode({f"{prefix}{key}": value for key, value in report_params.items()}),
     }
 
 
-def landing_overall(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
+def _previous_window(range_key, start_date, end_date):
+    """The window just before ``[start_date, end_date]``: previous day, month, year or same-length span."""
+    if range_key == "month":
+        end = start_date - timedelta(days=1)
+        return end.replace(day=1), end
+    if range_key == "year":
+        return date(start_date.year - 1, 1, 1), date(start_date.year - 1, 12, 31)
+    length = end_date - start_date
+    end = start_date - timedelta(days=1)
+    return end - length, end
+
 
-    dept = get_department(request)
+def landing_overall(request):
+    dept = request.department
     filter_meta = _resolve_overall_filter(request)
     range_key = filter_meta["range_key"]
     start_date = filter_meta["start_date"]
@@ -366,10 +408,7 @@ def landing_overall(request):
 
 
 def landing_plot(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
-    dept = get_department(request)
+    dept = request.department
     category_lookup = dict(Project.PROJECT_CATEGORY)
     category_keys = [key for key, _label in Project.PROJECT_CATEGORY]
 
@@ -402,77 +441,99 @@ def landing_plot(request):
     return render(request, "partials/landing/plot.html", context)
 
 
-def landing_teambar(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
+TEAMBAR_TOP_N = 10
+TEAM_CHART_TOP_N = 12
+TEAM_WORKER_SORTS = {"name", "income", "projects", "date_of_join"}
 
-    dept = get_department(request)
-    all_workers = list(dept.workers.all().order_by("name"))
-    all_projects = dept.projects.all().prefetch_related("members__worker")
 
-    worker_project_count_map = defaultdict(int)
-    membership_rows = (
-        ProjectMember.objects
-        .filter(worker__in=all_workers, project__department=dept)
-        .values("worker_id")
-        .annotate(project_count=Count("project_id", distinct=True))
-    )
-    for row in membership_rows:
-        worker_project_count_map[row["worker_id"]] = int(row["project_count"] or 0)
+def _worker_initials(name):
+    parts = [part for part in (name or "").split() if part]
+    if len(parts) >= 2:
+        return (parts[0][0] + parts[1][0]).upper()
+    if parts:
+        return parts[0][:2].upper()
+    return "NA"
 
-    worker_income_map = defaultdict(Decimal)
-    worker_ids = {worker.id for worker in all_workers}
-    for project in all_projects:
-        payments = calculate_project_payments(project)
-        for member in project.members.all():
-            if member.worker_id in worker_ids:
-                worker_income_map[member.worker_id] += payments.get(member.id, Decimal("0.00"))
 
-    max_project_count = max((worker_project_count_map.get(worker.id, 0) for worker in all_workers), default=1)
+def landing_teambar(request):
+    dept = request.department
+    aggregates = worker_aggregates(dept)
+    total_workers = dept.workers.count()
+
+    max_project_count = max((entry["project_count"] for entry in aggregates.values()), default=1)
     if max_project_count <= 0:
         max_project_count = 1
-    max_income = max((worker_income_map.get(worker.id, Decimal("0.00")) for worker in all_workers), default=Decimal("1.00"))
+    max_income = max((entry["income"] for entry in aggregates.values()), default=Decimal("1.00"))
     if max_income <= 0:
         max_income = Decimal("1.00")
 
-    worker_rows = []
-    for worker in all_workers:
-        parts = [part for part in worker.name.split() if part]
-        if len(parts) >= 2:
-            initials = (parts[0][0] + parts[1][0]).upper()
-        elif parts:
-            initials = parts[0][:2].upper()
-        else:
-            initials = "NA"
-
-        project_count = int(worker_project_count_map.get(worker.id, 0))
-        income_value = worker_income_map.get(worker.id, Decimal("0.00"))
-        project_pct = (project_count / max_project_count) * 100 if max_project_count > 0 else 0.0
-        income_pct = float((income_value / max_income) * Decimal("100")) if max_income > 0 else 0.0
-        combined_score = project_pct + income_pct
+    def score(entry):
+        project_pct = (entry["project_count"] / max_project_count) * 100
+        income_pct = float((entry["income"] / max_income) * Decimal("100"))
+        return project_pct, income_pct
+
+    def rank(item):
+        entry = item[1]
+        return round(sum(score(entry)), 2), entry["income"], entry["project_count"]
+
+    # Rank only workers with a non-zero score; everyone else is either used
+    # to pad the top N (by name) or folded into the "Others" bar. Ties are
+    # broken by name, so every worker tied with the Nth is looked up.
+    scored = [item for item in aggregates.items() if any(rank(item))]
+    ranked_workers = []
+    top_entries = heapq.nlargest(TEAMBAR_TOP_N, scored, key=rank)
+    if top_entries:
+        cutoff = rank(top_entries[-1])
+        candidates = [item for item in scored if rank(item) >= cutoff]
+        workers_by_id = dept.workers.in_bulk([worker_id for worker_id, _entry in candidates])
+        candidates = [item for item in candidates if item[0] in workers_by_id]
+        candidates.sort(key=lambda item: (*(-value for value in rank(item)), workers_by_id[item[0]].name.lower()))
+        ranked_workers = [workers_by_id[worker_id] for worker_id, _entry in candidates[:TEAMBAR_TOP_N]]
+    if len(ranked_workers) < TEAMBAR_TOP_N:
+        ranked_workers.extend(
+            dept.workers.exclude(id__in=[worker.id for worker in ranked_workers])
+            .order_by(Lower("name"), "id")[:TEAMBAR_TOP_N - len(ranked_workers)]
+        )
 
+    worker_rows = []
+    for worker in ranked_workers:
+        entry = aggregates.get(worker.id, empty_worker_aggregate())
+        project_pct, income_pct = score(entry)
         worker_rows.append(
             {
                 "id": worker.id,
                 "name": worker.name,
                 "image_url": worker.image.url if worker.image else "",
-                "initials": initials,
-                "project_count": project_count,
-                "income_value": float(income_value),
+                "initials": _worker_initials(worker.name),
+                "project_count": entry["project_count"],
+                "income_value": float(entry["income"]),
                 "project_pct": round(project_pct, 2),
                 "income_pct": round(income_pct, 2),
-                "combined_score": round(combined_score, 2),
+                "combined_score": round(project_pct + income_pct, 2),
             }
         )
 
-    worker_rows.sort(key=lambda item: (-item["combined_score"], -item["income_value"], -item["project_count"], item["name"].lower()))
-
     chart_labels = [item["name"] for item in worker_rows]
     chart_income_values = [float(item["income_value"]) for item in worker_rows]
     chart_project_values = [float(item["project_count"]) * -1.0 for item in worker_rows]
     chart_worker_images = [item["image_url"] for item in worker_rows]
     chart_worker_initials = [item["initials"] for item in worker_rows]
 
+    others_count = total_workers - len(worker_rows)
+    if others_count > 0:
+        shown_ids = {item["id"] for item in worker_rows}
+        others_income = Decimal("0.00")
+        others_projects = 0
+        for worker_id, entry in aggregates.items():
+            if worker_id not in shown_ids:
+                others_income += entry["income"]
+                others_projects += entry["project_count"]
+        chart_labels.append(f"Others ({others_count})")
+        chart_income_values.append(float(others_income))
+        chart_project_values.append(float(others_projects) * -1.0)
+        chart_worker_images.append("")
+        chart_worker_initials.append("+")
+
     context = {
         "worker_rows": worker_rows,
         "chart_labels": chart_labels,
@@ -485,11 +546,9 @@ def landing_teambar(request):
 
 
 def team(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
-    all_workers = dept.workers.all().order_by("name")
-    all_projects = dept.projects.all().prefetch_related("members__worker")
+    dept = request.department
+    all_workers = dept.workers.all()
+    all_projects = dept.projects.all()
 
     staff_count = all_workers.filter(worker_type="staff").count()
     intern_count = all_workers.filter(worker_type="intern").count()
@@ -522,41 +581,23 @@ def team(request):
         Decimal(str(completion_rate_pct)) / Decimal("100")
     )
 
-    worker_project_count_map = defaultdict(int)
-    membership_rows = (
-        ProjectMember.objects
-        .filter(worker__in=all_workers, project__department=dept)
-        .values("worker_id")
-        .annotate(project_count=Count("project_id", distinct=True))
-    )
-    for row in membership_rows:
-        worker_project_count_map[row["worker_id"]] = int(row["project_count"] or 0)
-
-    worker_income_map = defaultdict(Decimal)
-    all_worker_ids = set(all_workers.values_list("id", flat=True))
-    for project in all_projects:
-        payments = calculate_project_payments(project)
-        for member in project.members.all():
-            if member.worker_id in all_worker_ids:
-                worker_income_map[member.worker_id] += payments.get(member.id, Decimal("0.00"))
-
-    worker_status_map = defaultdict(lambda: {
-        "finished": 0,
-        "ongoing": 0,
-        "on_hold": 0,
-        "canceled": 0,
-    })
-    worker_status_rows = (
-        ProjectMember.objects
-        .filter(worker__in=all_workers, project__department=dept)
-        .values("worker_id", "project__status")
-        .annotate(project_count=Count("project_id", distinct=True))
-    )
-    for row in worker_status_rows:
-        worker_id = row["worker_id"]
-        status_key = row["project__status"]
-        if status_key in worker_status_map[worker_id]:
-            worker_status_map[worker_id][status_key] = int(row["project_count"] or 0)
+    # Charts show the top earners plus a single "Others" bucket so the payload
+    # stays the same size however many workers the department has.
+    aggregates = worker_aggregates(dept)
+    ranked_ids = [
+        worker_id
+        for worker_id, _entry in sorted(
+            aggregates.items(),
+            key=lambda item: (-item[1]["income"], -item[1]["project_count"], item[0]),
+        )[:TEAM_CHART_TOP_N]
+    ]
+    top_workers = dept.workers.in_bulk(ranked_ids)
+    chart_workers = [top_workers[worker_id] for worker_id in ranked_ids if worker_id in top_workers]
+    if len(chart_workers) < TEAM_CHART_TOP_N:
+        chart_workers.extend(
+            dept.workers.exclude(id__in=[worker.id for worker in chart_workers])
+            .order_by("name")[:TEAM_CHART_TOP_N - len(chart_workers)]
+        )
 
     today = date.today()
     worker_labels = []
@@ -570,45 +611,40 @@ def team(request):
     worker_ongoing_values = []
     worker_on_hold_values = []
     worker_canceled_values = []
-    worker_rows = []
-
-    for worker in all_workers:
-        parts = [part for part in worker.name.split() if part]
-        if len(parts) >= 2:
-            initials = (parts[0][0] + parts[1][0]).upper()
-        elif parts:
-            initials = parts[0][:2].upper()
-        else:
-            initials = "NA"
-
+    others_entry = empty_worker_aggregate()
+    for entry in aggregates.values():
+        for key in others_entry:
+            others_entry[key] += entry[key]
+
+    for worker in chart_workers:
+        entry = aggregates.get(worker.id, empty_worker_aggregate())
+        for key in others_entry:
+            others_entry[key] -= entry[key]
         worker_labels.append(worker.name)
-        worker_income_values.append(float(worker_income_map.get(worker.id, Decimal("0.00"))))
-        worker_project_values.append(worker_project_count_map.get(worker.id, 0))
+        worker_income_values.append(float(entry["income"]))
+        worker_project_values.append(entry["project_count"])
         worker_experience_values.append(max((today - worker.date_of_join).days, 0))
         worker_type_values.append(worker.worker_type)
         worker_image_urls.append(worker.image.url if worker.image else "")
-        worker_initials.append(initials)
-        status_counts = worker_status_map[worker.id]
-        worker_finished_values.append(status_counts["finished"])
-        worker_ongoing_values.append(status_counts["ongoing"])
-        worker_on_hold_values.append(status_counts["on_hold"])
-        worker_canceled_values.append(status_counts["canceled"])
-        worker_rows.append(
-            {
-                "id": worker.id,
-                "name": worker.name,
-                "email": worker.email,
-                "date_of_join": worker.date_of_join,
-                "posting": worker.posting,
-                "image_url": worker.image.url if worker.image else "",
-                "initials": initials,
-                "worker_type": worker.worker_type,
-                "working_status": worker.working_status,
-                "view_url": reverse("worker_detail", args=[worker.id]),
-                "update_url": reverse("edit_worker", args=[worker.id]),
-                "delete_url": reverse("delete_worker", args=[worker.id]),
-            }
-        )
+        worker_initials.append(_worker_initials(worker.name))
+        worker_finished_values.append(entry["finished"])
+        worker_ongoing_values.append(entry["ongoing"])
+        worker_on_hold_values.append(entry["on_hold"])
+        worker_canceled_values.append(entry["canceled"])
+
+    others_count = total_workers - len(chart_workers)
+    if others_count > 0:
+        worker_labels.append(f"Others ({others_count})")
+        worker_income_values.append(float(others_entry["income"]))
+        worker_project_values.append(others_entry["project_count"])
+        worker_experience_values.append(0)
+        worker_type_values.append("others")
+        worker_image_urls.append("")
+        worker_initials.append("+")
+        worker_finished_values.append(others_entry["finished"])
+        worker_ongoing_values.append(others_entry["ongoing"])
+        worker_on_hold_values.append(others_entry["on_hold"])
+        worker_canceled_values.append(others_entry["canceled"])
 
     context = {
         "staff_count": staff_count,
@@ -630,16 +666,98 @@ def team(request):
         "worker_ongoing_values": worker_ongoing_values,
         "worker_on_hold_values": worker_on_hold_values,
         "worker_canceled_values": worker_canceled_values,
-        "workers": worker_rows,
     }
     return render(request, "partials/team.html", context)
 
 
-def worker_detail(request, worker_id):
-    if not request.session.get("department_id"):
-        return redirect("login")
+@department_json_endpoint
+def team_workers_api(request):
+    try:
+        offset = max(int(request.GET.get("offset", 0)), 0)
+    except (TypeError, ValueError):
+        offset = 0
+    try:
+        limit = int(request.GET.get("limit", 7))
+    except (TypeError, ValueError):
+        limit = 7
+    limit = max(1, min(limit, 50))
+
+    sort_value = (request.GET.get("sort") or "name").strip()
+    descending = sort_value.startswith("-")
+    sort_key = sort_value.lstrip("-")
+    if sort_key not in TEAM_WORKER_SORTS:
+        sort_key, descending = "name", False
+
+    dept = request.department
+    queryset = dept.workers.all()
+
+    search_query = request.GET.get("q", "").strip()
+    type_value = request.GET.get("type", "").strip()
+    status_value = request.GET.get("status", "").strip()
+
+    if search_query:
+        queryset = queryset.filter(Q(name__icontains=search_query) | Q(email__icontains=search_query))
+    if type_value in {choice[0] for choice in Worker.WORKER_TYPE}:
+        queryset = queryset.filter(worker_type=type_value)
+    if status_value in {choice[0] for choice in Worker.WORKING_STATUS}:
+        queryset = queryset.filter(working_status=status_value)
+
+    aggregates = worker_aggregates(dept)
+    if sort_key in {"name", "date_of_join"}:
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{sort_key}", f"{prefix}id")
+        total_count = queryset.count()
+        rows = list(queryset[offset:offset + limit])
+    else:
+        metric = "income" if sort_key == "income" else "project_count"
+        empty = empty_worker_aggregate()
+        candidate_ids = sorted(
+            queryset.values_list("id", flat=True),
+            key=lambda worker_id: (aggregates.get(worker_id, empty)[metric], worker_id),
+            reverse=descending,
+        )
+        total_count = len(candidate_ids)
+        page_ids = candidate_ids[offset:offset + limit]
+        workers_by_id = dept.workers.in_bulk(page_ids)
+        rows = [workers_by_id[worker_id] for worker_id in page_ids if worker_id in workers_by_id]
+
+    payload = []
+    for worker in rows:
+        entry = aggregates.get(worker.id, empty_worker_aggregate())
+        payload.append(
+            {
+                "id": worker.id,
+                "name": worker.name,
+                "email": worker.email or "",
+                "date_of_join": worker.date_of_join.strftime("%Y-%m-%d"),
+                "posting": worker.posting,
+                "image_url": worker.image.url if worker.image else "",
+                "initials": _worker_initials(worker.name),
+                "worker_type": worker.worker_type,
+                "working_status": worker.working_status,
+                "income": round(float(entry["income"]), 2),
+                "project_count": entry["project_count"],
+            }
+        )
 
-    dept = get_department(request)
+    next_offset = offset + len(rows)
+    return FastJsonResponse(
+        {
+            "workers": payload,
+            "total_count": total_count,
+            "next_offset": next_offset,
+            "has_more": next_offset < total_count,
+            "url_templates": url_templates(
+                view="worker_detail",
+                update="edit_worker",
+                delete="delete_worker",
+            ),
+        }
+    )
+
+
+def worker_detail(request, worker_id):
+    dept = request.department
     worker = dept.workers.filter(id=worker_id).first()
     if not worker:
         messages.error(request, "Worker not found.")
@@ -769,7 +887,7 @@ def worker_detail(request, worker_id):
                 "title": project.title,
                 "category_label": category_lookup.get(project.category, project.category.title()),
                 "amount": float(project.amount) if project.amount is not None else None,
-                "view_url": reverse("project_detail", args=[project.id]),
+                "view_url": object_url("project_detail", project.id),
             }
         )
 
@@ -1001,9 +1119,7 @@ def _build_project_category_dashboard_context(dept, category_key):
 
 
 def _render_project_category_dashboard(request, category_key, template_name):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     context = _build_project_category_dashboard_context(dept, category_key)
     return render(request, template_name, context)
 
@@ -1020,7 +1136,7 @@ def _category_template_name(category_key):
 def _render_category_dashboard_by_key(request, category_key):
     template_name = _category_template_name(category_key)
     if not template_name:
-        dept = get_department(request)
+        dept = request.department
         return render(
             request,
             "partials/index.html",
@@ -1033,13 +1149,11 @@ def _render_category_dashboard_by_key(request, category_key):
     return _render_project_category_dashboard(request, category_key, template_name)
 
 
+@department_json_endpoint
 def category_projects_api(request, category_key):
-    if not request.session.get("department_id"):
-        return JsonResponse({"detail": "Unauthorized"}, status=401)
-
     valid_categories = {choice[0] for choice in Project.PROJECT_CATEGORY}
     if category_key not in valid_categories:
-        return JsonResponse({"detail": "Invalid category"}, status=400)
+        return FastJsonResponse({"detail": "Invalid category"}, status=400)
 
     try:
         offset = max(int(request.GET.get("offset", 0)), 0)
@@ -1051,7 +1165,7 @@ def category_projects_api(request, category_key):
         limit = 7
     limit = max(1, min(limit, 25))
 
-    dept = get_department(request)
+    dept = request.department
     base_queryset = dept.projects.filter(category=category_key)
     queryset = base_queryset
 
@@ -1097,136 +1211,280 @@ def category_projects_api(request, category_key):
                 "status": project.status,
                 "status_display": project.get_status_display(),
                 "start_date": project.start_date.strftime("%Y-%m-%d"),
-                "view_url": reverse("project_detail", args=[project.id]),
-                "update_url": reverse("edit_project", args=[project.id]),
-                "delete_url": reverse("delete_project", args=[project.id]),
             }
         )
 
     next_offset = offset + len(rows)
     has_more = next_offset < total_count
-    return JsonResponse(
+    return FastJsonResponse(
         {
             "projects": payload,
             "next_offset": next_offset,
             "has_more": has_more,
             "available_years": available_years,
+            "url_templates": url_templates(
+                view="project_detail",
+                update="edit_project",
+                delete="delete_project",
+            ),
         }
     )
 
 
 @require_http_methods(["GET"])
 def project_category_report(request, category_key, file_format):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
     valid_categories = {choice[0] for choice in Project.PROJECT_CATEGORY}
     if category_key not in valid_categories:
-        return JsonResponse({"detail": "Invalid category"}, status=400)
+        return FastJsonResponse({"detail": "Invalid category"}, status=400)
 
-    dept = get_department(request)
+    dept = request.department
     file_format = (file_format or "").lower()
+    params = {"category": category_key}
     if file_format == "csv":
-        return generate_category_csv_report(dept, category_key)
+        return cached_report_response(request, dept, "category", "csv", params, lambda: generate_category_csv_report(dept, category_key))
     if file_format == "pdf":
-        return generate_category_pdf_report(dept, category_key)
+        return cached_report_response(request, dept, "category", "pdf", params, lambda: generate_category_pdf_report(dept, category_key))
+    if file_format == "stream":
+        return stream_category_csv_report(dept, category_key)
 
-    return JsonResponse({"detail": "Unsupported format"}, status=400)
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
 
 @require_http_methods(["GET"])
 def project_listing_report(request, category_key, file_format):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
     valid_categories = {choice[0] for choice in Project.PROJECT_CATEGORY}
     if category_key not in valid_categories:
-        return JsonResponse({"detail": "Invalid category"}, status=400)
+        return FastJsonResponse({"detail": "Invalid category"}, status=400)
 
-    dept = get_department(request)
+    dept = request.department
     file_format = (file_format or "").lower()
+    params = {"category": category_key, **normalize_listing_params(request.GET)}
     if file_format == "csv":
-        return generate_project_listing_excel_report(dept, category_key, request.GET)
+        return cached_report_response(request, dept, "listing", "csv", params, lambda: generate_project_listing_excel_report(dept, category_key, request.GET))
     if file_format == "pdf":
-        return generate_project_listing_pdf_report(dept, category_key, request.GET)
+        return cached_report_response(request, dept, "listing", "pdf", params, lambda: generate_project_listing_pdf_report(dept, category_key, request.GET))
+    if file_format == "stream":
+        return stream_project_listing_csv_report(dept, category_key, request.GET)
 
-    return JsonResponse({"detail": "Unsupported format"}, status=400)
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
 
 @require_http_methods(["GET"])
 def team_overall_report(request, file_format):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
-    dept = get_department(request)
+    dept = request.department
     fmt = (file_format or "").lower()
     if fmt == "csv":
-        return generate_team_csv_report(dept)
+        return cached_report_response(request, dept, "team", "csv", {}, lambda: generate_team_csv_report(dept))
     if fmt == "pdf":
-        return generate_team_pdf_report(dept)
+        return cached_report_response(request, dept, "team", "pdf", {}, lambda: generate_team_pdf_report(dept))
+    if fmt == "stream":
+        return stream_team_csv_report(dept)
 
-    return JsonResponse({"detail": "Unsupported format"}, status=400)
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
 
 @require_http_methods(["GET"])
 def main_overall_report(request, file_format):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
-    dept = get_department(request)
+    dept = request.department
     file_format = (file_format or "").lower()
     if file_format == "csv":
-        return generate_main_csv_report(dept)
+        return cached_report_response(request, dept, "main", "csv", {}, lambda: generate_main_csv_report(dept))
     if file_format == "pdf":
-        return generate_main_pdf_report(dept)
+        return cached_report_response(request, dept, "main", "pdf", {}, lambda: generate_main_pdf_report(dept))
+    if file_format == "stream":
+        return stream_main_csv_report(dept)
 
-    return JsonResponse({"detail": "Unsupported format"}, status=400)
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
 
 @require_http_methods(["GET"])
 def main_filter_report(request, file_format):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
-    dept = get_department(request)
+    dept = request.department
     filter_meta = _resolve_overall_filter(request)
     range_key = filter_meta["range_key"]
     start_date = filter_meta["start_date"]
     end_date = filter_meta["end_date"]
     file_format = (file_format or "").lower()
 
+    params = {"range": range_key, "start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
     if file_format == "csv":
-        return generate_main_filter_csv_report(dept, start_date, end_date, range_key)
+        return cached_report_response(
+            request, dept, "main_filter", "csv", params,
+            lambda: generate_main_filter_csv_report(dept, start_date, end_date, range_key),
+        )
     if file_format == "pdf":
-        return generate_main_filter_pdf_report(dept, start_date, end_date, range_key)
+        return cached_report_response(
+            request, dept, "main_filter", "pdf", params,
+            lambda: generate_main_filter_pdf_report(dept, start_date, end_date, range_key),
+        )
+    if file_format == "stream":
+        return stream_main_filter_csv_report(dept, start_date, end_date, range_key)
 
-    return JsonResponse({"detail": "Unsupported format"}, status=400)
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
 
 @require_http_methods(["GET"])
-def worker_detail_report(request, worker_id, file_format):
-    if not request.session.get("department_id"):
-        return redirect("login")
+def main_comparison_report(request, file_format):
+    dept = request.department
+    filter_meta = _resolve_overall_filter(request)
+    current = (filter_meta["start_date"], filter_meta["end_date"])
+    if request.GET.get("compare_range"):
+        compare_meta = _resolve_overall_filter(request, prefix="compare_")
+        baseline = (compare_meta["start_date"], compare_meta["end_date"])
+    else:
+        baseline = _previous_window(filter_meta["range_key"], *current)
+    file_format = (file_format or "").lower()
+
+    params = {
+        "start_date": current[0].isoformat(),
+        "end_date": current[1].isoformat(),
+        "compare_start_date": baseline[0].isoformat(),
+        "compare_end_date": baseline[1].isoformat(),
+    }
+    if file_format == "csv":
+        return cached_report_response(
+            request, dept, "comparison", "csv", params,
+            lambda: generate_comparison_csv_report(dept, current, baseline),
+        )
+    if file_format == "pdf":
+        return cached_report_response(
+            request, dept, "comparison", "pdf", params,
+            lambda: generate_comparison_pdf_report(dept, current, baseline),
+        )
+
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
-    dept = get_department(request)
+
+@require_http_methods(["GET"])
+def worker_detail_report(request, worker_id, file_format):
+    dept = request.department
     worker = dept.workers.filter(id=worker_id).first()
     if not worker:
-        return JsonResponse({"detail": "Worker not found"}, status=404)
+        return FastJsonResponse({"detail": "Worker not found"}, status=404)
 
     fmt = (file_format or "").lower()
+    params = {"worker_id": worker.id}
     if fmt == "csv":
-        return generate_worker_csv_report(dept, worker)
+        return cached_report_response(request, dept, "worker", "csv", params, lambda: generate_worker_csv_report(dept, worker))
     if fmt == "pdf":
-        return generate_worker_pdf_report(dept, worker)
+        return cached_report_response(request, dept, "worker", "pdf", params, lambda: generate_worker_pdf_report(dept, worker))
+    if fmt == "stream":
+        return stream_worker_csv_report(dept, worker)
 
-    return JsonResponse({"detail": "Unsupported format"}, status=400)
+    return FastJsonResponse({"detail": "Unsupported format"}, status=400)
 
 
-def project_detail(request, project_id):
-    if not request.session.get("department_id"):
-        return redirect("login")
+@department_login_not_required
+@staff_member_required
+@require_http_methods(["GET"])
+def consolidated_report(request):
+    return generate_consolidated_report()
+
+
+@require_http_methods(["GET"])
+def worker_reports_zip(request):
+    return generate_worker_reports_zip(request.department)
+
+
+@require_http_methods(["GET"])
+def department_report_pack(request):
+    return generate_department_report_pack(request.department)
+
 
-    dept = get_department(request)
+@department_json_endpoint
+@require_http_methods(["GET"])
+def analytics_export(request, dataset):
+    """
+    Machine-readable export for BI syncs: ``?format=ndjson`` (gzip, default)
+    or ``?format=parquet``, optionally limited with ``?since=<watermark>``.
+    """
+    if dataset not in DATASETS:
+        return FastJsonResponse({"detail": "Unknown dataset", "datasets": list(DATASETS)}, status=404)
+    fmt = (request.GET.get("format") or "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        return FastJsonResponse({"detail": "Unsupported format"}, status=400)
+    try:
+        since = parse_since(request.GET.get("since"))
+    except ValueError as exc:
+        return FastJsonResponse({"detail": str(exc)}, status=400)
+
+    return analytics_export_response(request.department, dataset, fmt, since)
+
+
+# =========================
+# BACKGROUND REPORT JOBS
+# =========================
+
+def _report_job_payload(job):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "report_type": job.report_type,
+        "file_format": job.file_format,
+        "error": job.error,
+        "status_url": reverse("report_job_status", args=[job.id]),
+        "download_url": reverse("report_job_download", args=[job.id]) if job.status == "done" else None,
+    }
+
+
+def _render_report_job(request, job, status=200):
+    if request.htmx:
+        return render(request, "partials/components/report_job_status.html", {"job": job}, status=status)
+    return FastJsonResponse(_report_job_payload(job), status=status)
+
+
+@department_json_endpoint
+@require_http_methods(["POST"])
+def report_job_enqueue(request):
+    dept = request.department
+    report_type = (request.POST.get("report_type") or "").lower()
+    file_format = (request.POST.get("file_format") or "").lower()
+    if report_type not in REPORT_GENERATORS:
+        return FastJsonResponse({"detail": "Unsupported report"}, status=400)
+    if file_format not in {"csv", "pdf"}:
+        return FastJsonResponse({"detail": "Unsupported format"}, status=400)
+
+    params = {}
+    if report_type == "worker":
+        worker_id = request.POST.get("worker_id")
+        if not (worker_id or "").isdigit() or not dept.workers.filter(id=int(worker_id)).exists():
+            return FastJsonResponse({"detail": "Worker not found"}, status=404)
+        params["worker_id"] = int(worker_id)
+
+    job = enqueue_report_job(dept, report_type, file_format, params)
+    return _render_report_job(request, job, status=202)
+
+
+@department_json_endpoint
+@require_http_methods(["GET"])
+def report_job_status(request, job_id):
+    job = ReportJob.objects.filter(id=job_id, department_id=request.department.id).first()
+    if not job:
+        return FastJsonResponse({"detail": "Report job not found"}, status=404)
+    return _render_report_job(request, job)
+
+
+@require_http_methods(["GET"])
+def report_job_download(request, job_id):
+    job = ReportJob.objects.filter(
+        id=job_id,
+        department_id=request.department.id,
+        status="done",
+    ).first()
+    if not job or not job.artifact:
+        raise Http404("Report is not ready")
+    try:
+        handle = job.artifact.open("rb")
+    except FileNotFoundError:
+        raise Http404("Report file is missing")
+    # Artifacts are written once per job, so the job id identifies the content.
+    return file_download_response(
+        request, handle, job.artifact.size, job.filename or os.path.basename(job.artifact.name), f"report-job-{job.pk}"
+    )
+
+
+def project_detail(request, project_id):
+    dept = request.department
     project = (
         dept.projects.filter(id=project_id)
         .prefetch_related("members__worker")
@@ -1303,10 +1561,7 @@ def project_detail(request, project_id):
 
 @require_http_methods(["GET", "POST"])
 def edit_project(request, project_id):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
-    dept = get_department(request)
+    dept = request.department
     project = dept.projects.filter(id=project_id).first()
     if not project:
         messages.error(request, "Project not found.")
@@ -1396,10 +1651,7 @@ def edit_project(request, project_id):
 
 @require_http_methods(["POST"])
 def delete_project(request, project_id):
-    if not request.session.get("department_id"):
-        return redirect("login")
-
-    dept = get_department(request)
+    dept = request.department
     project = dept.projects.filter(id=project_id).first()
     if not project:
         messages.error(request, "Project not found.")
@@ -1416,9 +1668,7 @@ def delete_project(request, project_id):
 
 
 def add_team(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     context = {"form_data": {}}
 
     if request.method == "POST":
@@ -1479,9 +1729,7 @@ def add_team(request):
 
 @require_http_methods(["GET", "POST"])
 def edit_worker(request, worker_id):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     worker = dept.workers.filter(id=worker_id).first()
     if not worker:
         messages.error(request, "Worker not found.")
@@ -1554,9 +1802,7 @@ def edit_worker(request, worker_id):
 
 @require_http_methods(["POST"])
 def delete_worker(request, worker_id):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     worker = dept.workers.filter(id=worker_id).first()
     if not worker:
         messages.error(request, "Worker not found.")
@@ -1572,9 +1818,7 @@ def delete_worker(request, worker_id):
 
 
 def add_project(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     context = {"form_data": {}}
 
     if request.method == "POST":
@@ -1642,9 +1886,7 @@ def add_project(request):
 
 
 def assign_project(request):
-    if not request.session.get("department_id"):
-        return redirect("login")
-    dept = get_department(request)
+    dept = request.department
     projects = dept.projects.all().order_by("-id")
     workers = dept.workers.all().order_by("name")
 
@@ -1713,6 +1955,7 @@ def assign_project(request):
 # =========================
 # LOGOUT
 # =========================
+@department_login_not_required
 def logout_view(request):
     request.session.flush()
     return redirect("login")
@@ -1722,51 +1965,5 @@ def calculate_project_payments(project):
     if not project.amount:
         return {}
 
-    members = list(project.members.select_related("worker"))
-
-    gold = [m for m in members if m.contribution == "gold"]
-    silver = [m for m in members if m.contribution == "silver"]
-    copper = [m for m in members if m.contribution == "copper"]
-
-    total_amount = Decimal(project.amount)
-
-    payments = {}
-
-    # Only gold → equal
-    if gold and not silver and not copper:
-        share = total_amount / len(gold)
-        for m in gold:
-            payments[m.id] = share
-
-    # Gold + Silver
-    elif gold and silver and not copper:
-        gold_total = total_amount * Decimal("0.60")
-        silver_total = total_amount * Decimal("0.40")
-
-        for m in gold:
-            payments[m.id] = gold_total / len(gold)
-
-        for m in silver:
-            payments[m.id] = silver_total / len(silver)
-
-    # Gold + Copper
-    elif gold and copper and not silver:
-        gold_total = total_amount * Decimal("0.70")
-        copper_total = total_amount * Decimal("0.30")
-
-        for m in gold:
-            payments[m.id] = gold_total / len(gold)
-
-        for m in copper:
-            payments[m.id] = copper_total / len(copper)
-
-    # Fallback weight system
-    else:
-        weight_map = {"gold":3, "silver":2, "copper":1}
-        total_weight = sum(weight_map[m.contribution] for m in members)
-
-        for m in members:
-            share = (Decimal(weight_map[m.contribution]) / Decimal(total_weight)) * total_amount
-            payments[m.id] = share
-
-    return payments
+    members = [(m.id, m.contribution) for m in project.members.all()]
+    return split_project_amount(project.amount, members)
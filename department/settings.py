@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'dashboard.middleware.ResponseCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "django_htmx.middleware.HtmxMiddleware",
+    'dashboard.middleware.DepartmentMiddleware',
 ]
 
 ROOT_URLCONF = 'department.urls'
@@ -91,6 +93,63 @@ DATABASES = {
 }
 
 
+# Cache
+# Point "default" at a shared backend (Redis/Memcached) in production so
+# cached aggregates are shared across workers. The department data version
+# that keys them lives in the database (Department.data_version).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard-default',
+    },
+    # Session cache for the cached_db engine. Every worker process must see
+    # the same sessions, so the stand-in is a file cache on local disk rather
+    # than LocMemCache (which would serve other processes stale sessions).
+    # Point it at Redis/Memcached in production.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'session_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Sessions are read from the "sessions" cache and written through to the
+# database, so a page's htmx fragments no longer each SELECT the session
+# row. 'django.contrib.sessions.backends.signed_cookies' removes the
+# session table entirely. Compare with `python manage.py benchmark_session_queries`.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Flash messages travel in a cookie instead of updating the session.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Login: password checks run on a small thread pool; attempts beyond
+# LOGIN_HASH_MAX_PENDING queued checks are turned away. Token buckets
+# (burst, tokens per minute) per client IP, per email and IP, and per email
+# reject attempts before any hashing. The email buckets only count failed
+# logins and are cleared by a successful one; the per-email bucket caps
+# guesses across rotating IPs with a larger burst. The buckets live in LOGIN_THROTTLE_CACHE,
+# which every worker process must share: the "sessions" file cache covers
+# one host, a shared Redis/Memcached alias is needed across hosts.
+LOGIN_HASH_WORKERS = 2
+LOGIN_HASH_MAX_PENDING = 32
+LOGIN_THROTTLE_CACHE = 'sessions'
+LOGIN_THROTTLE_IP = (10, 10)
+LOGIN_THROTTLE_EMAIL_IP = (5, 2)
+LOGIN_THROTTLE_EMAIL = (20, 4)
+
+WORKER_AGGREGATES_TIMEOUT = 300
+
+# Seconds the session department row stays cached (request.department)
+DEPARTMENT_CACHE_TIMEOUT = 60
+
+# Single-flight: concurrent identical report renders / aggregate misses run
+# once. The lock expires after LOCK_TIMEOUT seconds (keep it above the render
+# timeout); waiters give up and compute themselves after WAIT_TIMEOUT.
+SINGLE_FLIGHT_LOCK_TIMEOUT = 120
+SINGLE_FLIGHT_WAIT_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,6 +191,64 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static', 
 ]
 
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "dashboard.storage.PrecompressedStaticFilesStorage",
+    },
+    # Background report files. Kept outside MEDIA_ROOT so they are never
+    # served publicly; report_job_download checks the department first.
+    "report_jobs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": BASE_DIR / "private" / "report_jobs"},
+    },
+}
+
+# Response compression (htmx partials, JSON, CSV streams)
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 5
+
+# Background report jobs (`python manage.py run_report_worker`)
+REPORT_JOB_WORKERS = 2
+REPORT_JOB_POLL_INTERVAL = 2.0
+# Seconds a job may stay "running" before it is assumed lost (worker killed
+# or restarted mid-render) and marked failed, so it can be requested again.
+REPORT_JOB_STALE_AFTER = 30 * 60
+
+# PDF rendering runs in a process pool off the request thread.
+# Set REPORT_RENDER_WORKERS = 0 to render inline; timeout is in seconds.
+REPORT_RENDER_WORKERS = 2
+REPORT_RENDER_TIMEOUT = 60
+
+# Rendered report files, keyed by department data version and params
+REPORT_ARTIFACT_DIR = BASE_DIR / 'report_cache'
+REPORT_ARTIFACT_MAX_BYTES = 512 * 1024 * 1024
+
+# Report instrumentation: phase timings, rows, bytes and tracemalloc peak
+# per generated report, logged and stored in ReportMetric (admin summary).
+# tracemalloc slows every thread of the process down while a report is
+# traced, so it is off by default; enable it when profiling. Reports that
+# overlap another traced report record no peak.
+REPORT_METRICS_ENABLED = True
+REPORT_METRICS_TRACEMALLOC = False
+
+# Seconds the analytics export watermark trails the clock. Rows are stamped
+# with updated_at before their transaction commits, so this must be at
+# least as long as the longest write transaction or incremental exports
+# (?since=<watermark>) can skip rows. Full exports are not cut off; only
+# their returned watermark is lagged.
+ANALYTICS_EXPORT_SAFETY_LAG = 5 * 60
+
+# Nightly `python manage.py prerender_reports` process pool size
+REPORT_PRERENDER_WORKERS = 2
+
+# Threads reading departments in parallel for the staff consolidated report
+REPORT_GATHER_WORKERS = 4
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 